@@ -0,0 +1,127 @@
+"""
+Batch degrees-of-separation queries.
+
+Reads a CSV of (source, target) person_id pairs and writes one row per
+pair with the number of degrees and the path. Pairs are grouped by
+source, so each source needs a single breadth-first search tree no
+matter how many targets it has, and independent sources are spread
+across a pool of worker processes. Every worker memory-maps the same
+graph snapshot, so the read-only graph is shared rather than copied.
+
+Usage: python batch.py directory pairs.csv output.csv [--workers N]
+"""
+
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+
+FIELDS = ("source", "target", "degrees", "path")
+
+
+def one_to_many(source, targets):
+    """
+    Returns a dictionary mapping each target person_id to the shortest
+    list of (movie_id, person_id) pairs from the source, or to None if
+    it is not connected, using a single search from the source.
+    """
+    graph = degrees.graph
+    source_index = graph.person(source)
+    indices = {target: graph.person(target) for target in targets}
+    if source_index is None:
+        return {target: None for target in targets}
+
+    tree = graph.search_tree(
+        source_index,
+        {index for index in indices.values() if index is not None}
+    )
+    paths = {}
+    for target, index in indices.items():
+        path = None if index is None else graph.tree_path(
+            tree, source_index, index
+        )
+        if path is not None:
+            path = [(graph.movie_ids[movie], graph.person_ids[person])
+                    for movie, person in path]
+        paths[target] = path
+    return paths
+
+
+def read_pairs(filename):
+    """
+    Returns a dictionary mapping each source person_id to the list of
+    target person_ids it is paired with in a CSV file of pairs.
+    """
+    sources = {}
+    with open(filename, encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            sources.setdefault(row["source"], []).append(row["target"])
+    return sources
+
+
+def format_row(source, target, path):
+    """
+    Returns an output row for one pair.
+    """
+    if path is None:
+        return [source, target, "", ""]
+    return [source, target, len(path),
+            " ".join(f"{movie}:{person}" for movie, person in path)]
+
+
+def solve(job):
+    """
+    Returns the output rows for one (source, targets) job.
+    """
+    source, targets = job
+    paths = one_to_many(source, targets)
+    return [format_row(source, target, paths[target]) for target in targets]
+
+
+def run(directory, pairs, output, workers=None):
+    """
+    Answers every pair in the `pairs` CSV file against the data in
+    `directory`, streaming result rows to the `output` CSV file as each
+    source finishes. Returns the number of rows written.
+    """
+    degrees.load_data(directory)
+    jobs = list(read_pairs(pairs).items())
+    rows = 0
+
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+
+        if workers == 1:
+            for result in map(solve, jobs):
+                writer.writerows(result)
+                rows += len(result)
+        else:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=degrees.load_data,
+                                     initargs=(directory,)) as executor:
+                for result in executor.map(solve, jobs, chunksize=16):
+                    writer.writerows(result)
+                    rows += len(result)
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("pairs", help="CSV file with source,target columns")
+    parser.add_argument("output", help="CSV file to write results to")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (1 runs in-process)")
+    args = parser.parse_args()
+
+    rows = run(args.directory, args.pairs, args.output, args.workers)
+    print(f"{rows} pairs written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Benchmarks for the degrees search engines.
+
+    python benchmark.py frontiers [--people N] [--edges N] [--limit N]
+
+compares the list-based frontiers in util.py with the deque-based ones,
+by running breadth-first search over a random graph of people with each.
+
+    python benchmark.py search [--data DIR ...] [--generate N ...]
+                               [--queries N] [--modes MODE ...]
+
+runs a fixed, seeded set of queries with every shortest_path mode against
+each data directory, and against synthetic datasets of N people written
+in the same CSV format, and prints the instrumented results as JSON so
+that runs can be compared across changes.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import degrees
+from util import Node, QueueFrontier, DequeQueueFrontier, SearchStats
+
+
+def synthetic_graph(size, edges, seed=0):
+    """
+    Returns an adjacency list for a random undirected graph
+    of `size` people connected by `edges` edges.
+    """
+    rng = random.Random(seed)
+    neighbors = [[] for _ in range(size)]
+    for _ in range(edges):
+        a = rng.randrange(size)
+        b = rng.randrange(size)
+        neighbors[a].append(b)
+        neighbors[b].append(a)
+    return neighbors
+
+
+def search(neighbors, source, frontier_class, limit=None):
+    """
+    Runs breadth-first search from source, using the same loop as
+    degrees.shortest_path, until the graph or the expansion limit is
+    exhausted. Returns the number of expanded nodes.
+    """
+    frontier = frontier_class()
+    frontier.add(Node(person=source, movie=None, parent=None))
+    explored = set()
+    expansions = 0
+
+    while not frontier.empty():
+        if limit is not None and expansions >= limit:
+            break
+        node = frontier.remove()
+        expansions += 1
+        for person in neighbors[node.person]:
+            if person not in explored and not frontier.contains_state(person):
+                frontier.add(Node(person=person, movie=None, parent=node))
+        explored.add(node.person)
+
+    return expansions
+
+
+def generate_dataset(directory, people, seed=0):
+    """
+    Writes a synthetic people.csv, movies.csv and stars.csv to `directory`
+    with `people` people, half as many movies and four stars per movie.
+    Movie casts favour a random subset of prolific people, so the graph
+    has the hubs and long tail of the real dataset.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    movies = max(1, people // 2)
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(people):
+            writer.writerow([person + 1, f"Person {person}",
+                             rng.randrange(1920, 2005)])
+
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie in range(movies):
+            writer.writerow([movie + 1, f"Movie {movie}",
+                             rng.randrange(1920, 2024)])
+
+    prolific = max(1, people // 20)
+    with open(os.path.join(directory, "stars.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie in range(movies):
+            for _ in range(4):
+                if rng.random() < 0.3:
+                    person = rng.randrange(prolific)
+                else:
+                    person = rng.randrange(people)
+                writer.writerow([person + 1, movie + 1])
+
+
+def synthetic_directory(people, seed):
+    """
+    Returns the directory of a synthetic dataset, generating it first
+    if it does not exist yet.
+    """
+    directory = os.path.join(tempfile.gettempdir(),
+                             f"degrees-synthetic-{people}-{seed}")
+    if not os.path.exists(os.path.join(directory, "stars.csv")):
+        generate_dataset(directory, people, seed)
+    return directory
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def benchmark_dataset(directory, modes, queries, seed=0):
+    """
+    Loads a dataset and runs the same seeded queries with every mode.
+    Returns the results as a dictionary.
+    """
+    start = time.perf_counter()
+    degrees.load_data(directory)
+    load_time = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    person_ids = list(degrees.people)
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids))
+             for _ in range(queries)]
+
+    results = {}
+    lengths = {}
+    for mode in modes:
+        runs = []
+        for source, target in pairs:
+            stats = SearchStats()
+            path = degrees.shortest_path(source, target, mode=mode,
+                                         stats=stats)
+            runs.append(stats)
+            lengths.setdefault((source, target), set()).add(
+                None if path is None else len(path)
+            )
+        wall = [run.wall_time for run in runs]
+        results[mode] = {
+            "total_time": sum(wall),
+            "mean_time": sum(wall) / len(wall) if wall else 0.0,
+            "p50_time": percentile(wall, 0.50),
+            "p95_time": percentile(wall, 0.95),
+            "max_time": max(wall, default=0.0),
+            "mean_expansions": (sum(run.expansions for run in runs)
+                                / len(runs) if runs else 0.0),
+            "max_peak_frontier": max((run.peak_frontier for run in runs),
+                                     default=0),
+            "neighbor_time": sum(run.neighbor_time for run in runs)
+        }
+
+    return {
+        "directory": directory,
+        "people": len(degrees.people),
+        "movies": len(degrees.movies),
+        "load_time": load_time,
+        "landmarks": degrees.oracle is not None,
+        "queries": queries,
+        "mismatches": sum(1 for found in lengths.values() if len(found) > 1),
+        "modes": results
+    }
+
+
+def frontiers_main(args):
+    print(f"Generating graph: {args.people} people, {args.edges} edges...")
+    neighbors = synthetic_graph(args.people, args.edges, args.seed)
+
+    for frontier_class in (QueueFrontier, DequeQueueFrontier):
+        start = time.perf_counter()
+        expansions = search(neighbors, 0, frontier_class, args.limit)
+        elapsed = time.perf_counter() - start
+        rate = expansions / elapsed if elapsed else float("inf")
+        print(f"{frontier_class.__name__:>20}: {expansions} expansions "
+              f"in {elapsed:.3f}s ({rate:,.0f} expansions/s)")
+
+
+def search_main(args):
+    directories = list(args.data or [])
+    for people in args.generate or []:
+        directories.append(synthetic_directory(people, args.seed))
+    if not directories:
+        directories = ["small"]
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "datasets": [benchmark_dataset(directory, args.modes,
+                                       args.queries, args.seed)
+                     for directory in directories]
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    frontiers = commands.add_parser("frontiers",
+                                    help="compare frontier implementations")
+    frontiers.add_argument("--people", type=int, default=200_000)
+    frontiers.add_argument("--edges", type=int, default=1_000_000)
+    frontiers.add_argument("--seed", type=int, default=0)
+    frontiers.add_argument(
+        "--limit", type=int, default=1_000,
+        help="maximum expansions per search (the list frontier is quadratic)"
+    )
+    frontiers.set_defaults(run=frontiers_main)
+
+    searches = commands.add_parser("search",
+                                   help="compare shortest_path modes")
+    searches.add_argument("--data", action="append",
+                          help="data directory (repeatable)")
+    searches.add_argument("--generate", type=int, action="append",
+                          metavar="PEOPLE",
+                          help="synthetic dataset size (repeatable)")
+    searches.add_argument("--queries", type=int, default=50)
+    searches.add_argument("--modes", nargs="+", choices=degrees.MODES,
+                          default=list(degrees.MODES))
+    searches.add_argument("--seed", type=int, default=0)
+    searches.add_argument("--output", help="write JSON here, not stdout")
+    searches.set_defaults(run=search_main)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,68 @@
-import csv
 import sys
+import time
 
-from util import Node, StackFrontier, QueueFrontier
+import landmarks
+import nameindex
+import snapshot
+from graph import Graph
+from util import Node, DequeQueueFrontier as QueueFrontier
+
+# Person <-> movie graph, stored as integer-indexed CSR arrays
+graph = Graph()
 
 # Maps names to a set of corresponding person_ids
-names = {}
+names = graph.names
 
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+people = graph.people
 
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+movies = graph.movies
+
+# Landmark distance oracle, if one has been precomputed for the data
+oracle = None
+
+# Search engines accepted by shortest_path
+MODES = ("bfs", "bidirectional", "csr", "astar")
 
 
-def load_data(directory):
+def load_data(directory, cache=True):
     """
     Load data from CSV files into memory.
+
+    If `cache` is true, a binary snapshot of the graph is memory-mapped
+    instead when one exists and matches the CSV files, and is written
+    after parsing the CSV files otherwise. Landmarks precomputed with
+    landmarks.py are loaded too, if they were computed over the same rows.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+    global oracle
+    if cache and snapshot.load(graph, directory):
+        # Pick up rows appended to the CSV files since the snapshot
+        graph.ingest(directory)
+    else:
+        graph.load(directory)
+        if cache:
             try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
+                snapshot.save(graph, directory)
+            except OSError:
                 pass
+    oracle = landmarks.load(graph, directory)
+
+
+def ingest(directory):
+    """
+    Adds rows appended to the CSV files in `directory` since they were
+    loaded, without reloading the rest of the data.
+
+    Returns the set of person_ids whose co-stars changed. The landmark
+    oracle is dropped if anyone's did, since new connections can make
+    its distances too large to be valid bounds.
+    """
+    global oracle
+    touched = graph.ingest(directory)
+    if touched:
+        oracle = None
+    return {graph.person_ids[person] for person in touched}
 
 
 def main():
@@ -62,14 +75,16 @@ def main():
     load_data(directory)
     print("Data loaded.")
     
-    source = person_id_for_name(input("Name: "))
+    name = input("Name: ")
+    source = person_id_for_name(name)
     if source is None:
-        sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+        sys.exit(not_found_message(name))
+    name = input("Name: ")
+    target = person_id_for_name(name)
     if target is None:
-        sys.exit("Person not found.")
+        sys.exit(not_found_message(name))
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, mode="bidirectional")
 
     if path is None:
         print("Not connected.")
@@ -84,16 +99,60 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def not_found_message(name):
+    """
+    Returns the error for an unknown name, with suggestions if any.
+    """
+    suggestions = names_like(name, limit=5)
+    if not suggestions:
+        return "Person not found."
+    return f"Person not found. Did you mean: {', '.join(suggestions)}?"
+
+
+def shortest_path(source, target, mode="bfs", stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    `mode` selects the search engine: "bfs" searches outward from the
+    source only, "bidirectional" searches from both ends at once,
+    "csr" runs breadth-first search directly over the graph arrays and
+    "astar" runs A* search guided by the landmark oracle, falling back
+    to "csr" if no landmarks are loaded.
+
+    If `stats` is a util.SearchStats, the search records its counters
+    and timings there.
+
     If no possible path, returns None.
     """
+    if mode == "bfs":
+        search = breadth_first_path
+    elif mode == "bidirectional":
+        search = bidirectional_path
+    elif mode == "csr":
+        search = csr_path
+    elif mode == "astar":
+        search = astar_path
+    else:
+        raise ValueError(f"unknown search mode: {mode}")
+
+    if stats is None:
+        return search(source, target)
+    start = time.perf_counter()
+    try:
+        return search(source, target, stats)
+    finally:
+        stats.wall_time += time.perf_counter() - start
+
+
+def breadth_first_path(source, target, stats=None):
+    """
+    Breadth-first search from the source towards the target.
+    """
+    neighbors_of = neighbors_for_person
+    if stats is not None:
+        neighbors_of = stats.timed(neighbors_for_person)
 
-    # TODO
-   
     # Check for corner case, when source and target is the same person
     if source == target:
         return ()
@@ -115,10 +174,12 @@ def shortest_path(source, target):
             return None
 
         # Choose a node from the frontier
+        if stats is not None:
+            stats.expand(len(frontier))
         node = frontier.remove()
         
         # Look for the neighbors of the current person
-        neighbors = neighbors_for_person(node.person)
+        neighbors = neighbors_of(node.person)
         
         for movie, person in neighbors:
             if person not in explored and not frontier.contains_state(person):
@@ -146,6 +207,139 @@ def shortest_path(source, target):
         explored.add(node.person)
 
 
+def bidirectional_path(source, target, stats=None):
+    """
+    Breadth-first search from both the source and the target,
+    always growing whichever frontier is smaller by one full level.
+    """
+    neighbors_of = neighbors_for_person
+    if stats is not None:
+        neighbors_of = stats.timed(neighbors_for_person)
+
+    if source == target:
+        return ()
+
+    # Map each reached person to the (movie_id, person_id) step
+    # that leads back towards the side's starting person
+    forward = {source: None}
+    backward = {target: None}
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Expand the smaller side, so the search stays narrow
+        if len(forward_frontier) <= len(backward_frontier):
+            parents, depth, frontier = forward, forward_depth, forward_frontier
+            other, other_depth = backward, backward_depth
+        else:
+            parents, depth, frontier = backward, backward_depth, backward_frontier
+            other, other_depth = forward, forward_depth
+
+        next_frontier = []
+        meeting = None
+        best = None
+        for person in frontier:
+            if stats is not None:
+                stats.expand(len(forward_frontier) + len(backward_frontier)
+                             + len(next_frontier))
+            for movie, neighbor in neighbors_of(person):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (movie, person)
+                depth[neighbor] = depth[person] + 1
+                next_frontier.append(neighbor)
+
+                # Both searches have reached this person; keep the
+                # meeting point with the shortest combined path
+                if neighbor in other:
+                    length = depth[neighbor] + other_depth[neighbor]
+                    if best is None or length < best:
+                        best = length
+                        meeting = neighbor
+
+        if meeting is not None:
+            return join_paths(forward, backward, meeting)
+
+        if parents is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def csr_path(source, target, stats=None):
+    """
+    Breadth-first search over the integer-indexed graph arrays.
+    """
+    if source == target:
+        return ()
+
+    path = graph.shortest_path(graph.person(source), graph.person(target),
+                               stats)
+    if path is None:
+        return None
+    return [(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in path]
+
+
+def astar_path(source, target, stats=None):
+    """
+    A* search over the graph arrays, using the landmark lower bound as
+    the heuristic. Without landmarks, a zero heuristic would only make
+    this a slower breadth-first search, so csr_path is used instead.
+    """
+    if oracle is None:
+        return csr_path(source, target, stats)
+    if source == target:
+        return ()
+
+    source, target = graph.person(source), graph.person(target)
+    path = graph.astar_path(source, target, oracle.heuristic(target), stats)
+    if path is None:
+        return None
+    return [(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in path]
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two people from the landmark oracle, without searching, or None if
+    no landmarks are loaded. Either bound may be math.inf.
+    """
+    if oracle is None:
+        return None
+    return oracle.bounds(graph.person(source), graph.person(target))
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Stitches the two halves of a bidirectional search into a list
+    of (movie_id, person_id) pairs from the source to the target.
+    """
+
+    # Trace back from the meeting point to the source
+    path = []
+    person = meeting
+    while forward[person] is not None:
+        movie, parent = forward[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    # Follow the backward links from the meeting point to the target
+    person = meeting
+    while backward[person] is not None:
+        movie, person = backward[person]
+        path.append((movie, person))
+
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -172,16 +366,32 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def names_like(name, limit=10, max_distance=2):
+    """
+    Returns up to `limit` known names that `name` could have meant:
+    names starting with it come first, then names within `max_distance`
+    edits of it, closest first.
+    """
+    matches = nameindex.complete(graph, name, limit)
+    if len(matches) < limit:
+        for _, match in nameindex.fuzzy(graph, name, max_distance, limit):
+            if match not in matches:
+                matches.append(match)
+    return [graph.person_names[graph.people_named(match)[0]]
+            for match in matches[:limit]]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
+    person = graph.person(person_id)
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for movie in graph.movies_of(person):
+        movie_id = graph.movie_ids[movie]
+        for star in graph.stars_of(movie):
+            neighbors.add((movie_id, graph.person_ids[star]))
     return neighbors
 
 
@@ -0,0 +1,640 @@
+"""
+Compact, integer-indexed person <-> movie graph for degrees.py.
+
+Person and movie IDs are interned to dense integers, and the bipartite
+graph is stored as two CSR (compressed sparse row) adjacency lists held
+in `array` buffers: the movies of person `p` are
+`person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the stars
+of movie `m` are `movie_stars[movie_offsets[m]:movie_offsets[m + 1]]`.
+"""
+
+import csv
+import heapq
+import io
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+
+import nameindex
+
+# Typecodes for index arrays and offset arrays
+INDEX = "i"
+OFFSET = "q"
+
+# Distance recorded for people not connected to the search source
+UNREACHED = 255
+
+
+class Graph():
+
+    # String columns, stored as StringTables
+    TABLES = ("person_ids", "person_names", "person_births",
+              "movie_ids", "movie_titles", "movie_years")
+
+    # Integer columns: sorted lookup orders and CSR adjacency
+    ARRAYS = {
+        "person_order": INDEX,
+        "movie_order": INDEX,
+        "name_order": INDEX,
+        "name_groups": INDEX,
+        "gram_keys": "q",
+        "gram_offsets": OFFSET,
+        "gram_names": INDEX,
+        "person_offsets": OFFSET,
+        "person_movies": INDEX,
+        "movie_offsets": OFFSET,
+        "movie_stars": INDEX,
+    }
+
+    def __init__(self):
+        # Read-only views that mimic the original dictionaries
+        self.names = NamesView(self)
+        self.people = PeopleView(self)
+        self.movies = MoviesView(self)
+
+        self.clear()
+
+    def clear(self):
+        """
+        Empties the graph, keeping the views alive.
+        """
+        for name in self.TABLES:
+            setattr(self, name, StringTable.from_strings([]))
+        for name, typecode in self.ARRAYS.items():
+            setattr(self, name, array(typecode))
+        self.person_offsets.append(0)
+        self.movie_offsets.append(0)
+        self.name_groups.append(0)
+        self.gram_offsets.append(0)
+
+        # Byte offset in each source CSV file up to which rows are loaded
+        self.sources = {}
+
+        # Rows appended by ingest, on top of the CSR arrays
+        self.extra_names = {}
+        self.extra_person_movies = {}
+        self.extra_movie_stars = {}
+
+    def load(self, directory):
+        """
+        Load data from CSV files into the graph.
+        """
+        self.clear()
+        person_index = {}
+        person_ids, person_names, person_births = [], [], []
+        movie_index = {}
+        movie_ids, movie_titles, movie_years = [], [], []
+
+        # Load people
+        rows, self.sources["people.csv"] = read_rows(directory, "people.csv")
+        for row in rows:
+            person_index[row["id"]] = len(person_ids)
+            person_ids.append(row["id"])
+            person_names.append(row["name"])
+            person_births.append(row["birth"])
+
+        # Load movies
+        rows, self.sources["movies.csv"] = read_rows(directory, "movies.csv")
+        for row in rows:
+            movie_index[row["id"]] = len(movie_ids)
+            movie_ids.append(row["id"])
+            movie_titles.append(row["title"])
+            movie_years.append(row["year"])
+
+        # Load stars as (person, movie) index pairs, dropping duplicates
+        # and rows that refer to unknown people or movies
+        stars_people = array(INDEX)
+        stars_movies = array(INDEX)
+        seen = set()
+        movie_count = len(movie_ids)
+        rows, self.sources["stars.csv"] = read_rows(directory, "stars.csv")
+        for row in rows:
+            try:
+                person = person_index[row["person_id"]]
+                movie = movie_index[row["movie_id"]]
+            except KeyError:
+                continue
+            key = person * movie_count + movie
+            if key in seen:
+                continue
+            seen.add(key)
+            stars_people.append(person)
+            stars_movies.append(movie)
+
+        self.person_ids = StringTable.from_strings(person_ids)
+        self.person_names = StringTable.from_strings(person_names)
+        self.person_births = StringTable.from_strings(person_births)
+        self.movie_ids = StringTable.from_strings(movie_ids)
+        self.movie_titles = StringTable.from_strings(movie_titles)
+        self.movie_years = StringTable.from_strings(movie_years)
+
+        self.person_order = sorted_order(person_ids)
+        self.movie_order = sorted_order(movie_ids)
+        lowered = [name.lower() for name in person_names]
+        self.name_order = sorted_order(lowered)
+        index = nameindex.build([lowered[person] for person in self.name_order])
+        for name, values in index.items():
+            setattr(self, name, array(self.ARRAYS[name], values))
+
+        self.person_offsets, self.person_movies = build_csr(
+            len(person_ids), stars_people, stars_movies
+        )
+        self.movie_offsets, self.movie_stars = build_csr(
+            len(movie_ids), stars_movies, stars_people
+        )
+
+    def ingest(self, directory):
+        """
+        Adds the rows appended to the CSV files in `directory` since they
+        were last read, without rebuilding the CSR arrays: new people,
+        movies and stars are kept alongside them instead.
+
+        Returns the set of person indices whose co-stars changed, which
+        are the endpoints of every new person <-> person edge.
+        """
+        # Add people
+        rows, self.sources["people.csv"] = read_rows(
+            directory, "people.csv", self.sources.get("people.csv", 0)
+        )
+        for row in rows:
+            if self.person(row["id"]) is not None:
+                continue
+            self.extra_names.setdefault(row["name"].lower(), []).append(
+                len(self.person_ids)
+            )
+            self.person_ids.append(row["id"])
+            self.person_names.append(row["name"])
+            self.person_births.append(row["birth"])
+
+        # Add movies
+        rows, self.sources["movies.csv"] = read_rows(
+            directory, "movies.csv", self.sources.get("movies.csv", 0)
+        )
+        for row in rows:
+            if self.movie(row["id"]) is not None:
+                continue
+            self.movie_ids.append(row["id"])
+            self.movie_titles.append(row["title"])
+            self.movie_years.append(row["year"])
+
+        # Add stars, dropping duplicates and unknown people or movies
+        changed = set()
+        rows, self.sources["stars.csv"] = read_rows(
+            directory, "stars.csv", self.sources.get("stars.csv", 0)
+        )
+        for row in rows:
+            person = self.person(row["person_id"])
+            movie = self.movie(row["movie_id"])
+            if person is None or movie is None or movie in self.movies_of(person):
+                continue
+            self.extra_person_movies.setdefault(person, []).append(movie)
+            self.extra_movie_stars.setdefault(movie, []).append(person)
+            changed.add(movie)
+
+        touched = set()
+        for movie in changed:
+            touched.update(self.stars_of(movie))
+        return touched
+
+    def has_extras(self):
+        """
+        Returns True if rows have been ingested on top of the CSR arrays.
+        """
+        return any(table.extra for table in self.tables()) or bool(
+            self.extra_person_movies
+        )
+
+    def tables(self):
+        """
+        Returns the StringTables of the graph.
+        """
+        return [getattr(self, name) for name in self.TABLES]
+
+    def person(self, person_id):
+        """
+        Returns the integer index of a person_id, or None if unknown.
+        """
+        return find(self.person_ids, self.person_order, person_id)
+
+    def movie(self, movie_id):
+        """
+        Returns the integer index of a movie_id, or None if unknown.
+        """
+        return find(self.movie_ids, self.movie_order, movie_id)
+
+    def people_named(self, name):
+        """
+        Returns the person indices whose lowercased name equals `name`.
+        """
+        names = self.person_names
+        order = self.name_order
+        key = lambda person: names[person].lower()
+        lo = bisect_left(order, name, key=key)
+        hi = bisect_right(order, name, lo=lo, key=key)
+        return list(order[lo:hi]) + self.extra_names.get(name, [])
+
+    def movies_of(self, person):
+        """
+        Returns the movie indices for a person index.
+        """
+        offsets = self.person_offsets
+        if person < len(offsets) - 1:
+            movies = self.person_movies[offsets[person]:offsets[person + 1]]
+        else:
+            movies = ()
+        extra = self.extra_person_movies.get(person)
+        if extra:
+            return list(movies) + extra
+        return movies
+
+    def stars_of(self, movie):
+        """
+        Returns the person indices for a movie index.
+        """
+        offsets = self.movie_offsets
+        if movie < len(offsets) - 1:
+            stars = self.movie_stars[offsets[movie]:offsets[movie + 1]]
+        else:
+            stars = ()
+        extra = self.extra_movie_stars.get(movie)
+        if extra:
+            return list(stars) + extra
+        return stars
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie, person) index pairs that
+        connect the source index to the target index, or None.
+        """
+        if source == target:
+            return []
+        tree = self.search_tree(source, {target}, stats)
+        return self.tree_path(tree, source, target)
+
+    def search_tree(self, source, targets=None, stats=None):
+        """
+        Runs breadth-first search from the source index and returns the
+        search tree as a (parent_person, parent_movie) pair of arrays,
+        where unreached people have a parent of -1.
+
+        If `targets` is given, the search stops as soon as every target
+        index has been reached. The search walks the CSR arrays directly:
+        parents are kept in preallocated arrays, and each movie's cast is
+        scanned only once.
+
+        If `stats` is a util.SearchStats, the search records its counters
+        and timings there.
+        """
+        movies_of = self.movies_of
+        stars_of = self.stars_of
+        if stats is not None:
+            movies_of = stats.timed(movies_of)
+            stars_of = stats.timed(stars_of)
+
+        people = len(self.person_ids)
+        parent_person = array(INDEX, [-1]) * people
+        parent_movie = array(INDEX, [-1]) * people
+        movie_seen = bytearray(len(self.movie_ids))
+        queue = array(INDEX, [0]) * people
+        tree = (parent_person, parent_movie)
+
+        remaining = None if targets is None else set(targets)
+        if remaining is not None:
+            remaining.discard(source)
+            if not remaining:
+                return tree
+
+        queue[0] = source
+        parent_person[source] = source
+        head, tail = 0, 1
+
+        while head < tail:
+            if stats is not None:
+                stats.expand(tail - head)
+            person = queue[head]
+            head += 1
+            for movie in movies_of(person):
+                if movie_seen[movie]:
+                    continue
+                movie_seen[movie] = 1
+                for star in stars_of(movie):
+                    if parent_person[star] != -1:
+                        continue
+                    parent_person[star] = person
+                    parent_movie[star] = movie
+                    if remaining is not None and star in remaining:
+                        remaining.remove(star)
+                        if not remaining:
+                            return tree
+                    queue[tail] = star
+                    tail += 1
+
+        return tree
+
+    def tree_path(self, tree, source, target):
+        """
+        Returns the list of (movie, person) index pairs leading from the
+        source to the target in a search tree, or None if the target
+        was not reached.
+        """
+        parent_person, parent_movie = tree
+        if source == target:
+            return []
+        if parent_person[target] == -1:
+            return None
+        return self.trace(parent_person, parent_movie, source, target)
+
+    def distances(self, *sources):
+        """
+        Returns an array of the number of degrees from the nearest of the
+        source indices to every person, with UNREACHED for people who are
+        not connected. Distances are capped at UNREACHED - 1.
+        """
+        movies_of = self.movies_of
+        stars_of = self.stars_of
+
+        people = len(self.person_ids)
+        distance = array("B", [UNREACHED]) * people
+        movie_seen = bytearray(len(self.movie_ids))
+        queue = array(INDEX, [0]) * people
+
+        head, tail = 0, 0
+        for source in sources:
+            if distance[source] == UNREACHED:
+                distance[source] = 0
+                queue[tail] = source
+                tail += 1
+
+        while head < tail:
+            person = queue[head]
+            head += 1
+            step = min(distance[person] + 1, UNREACHED - 1)
+            for movie in movies_of(person):
+                if movie_seen[movie]:
+                    continue
+                movie_seen[movie] = 1
+                for star in stars_of(movie):
+                    if distance[star] == UNREACHED:
+                        distance[star] = step
+                        queue[tail] = star
+                        tail += 1
+
+        return distance
+
+    def astar_path(self, source, target, heuristic, stats=None):
+        """
+        Returns the shortest list of (movie, person) index pairs that
+        connect the source index to the target index, or None, using A*
+        search. `heuristic(person)` must return a consistent lower bound
+        on the degrees from person to target, or None if person cannot
+        reach the target at all.
+        """
+        if source == target:
+            return []
+
+        movies_of = self.movies_of
+        stars_of = self.stars_of
+        if stats is not None:
+            movies_of = stats.timed(movies_of)
+            stars_of = stats.timed(stars_of)
+
+        people = len(self.person_ids)
+        cost = array(INDEX, [-1]) * people
+        parent_person = array(INDEX, [-1]) * people
+        parent_movie = array(INDEX, [-1]) * people
+        closed = bytearray(people)
+        # Cost given to a movie's cast when it was last scanned. A movie
+        # is scanned again only from a cheaper person, which the tie-break
+        # towards deeper nodes allows, so each cast is scanned at most twice.
+        movie_cost = array(INDEX, [-1]) * len(self.movie_ids)
+
+        estimate = heuristic(source)
+        if estimate is None:
+            return None
+        cost[source] = 0
+        parent_person[source] = source
+        heap = [(estimate, 0, source)]
+
+        while heap:
+            _, _, person = heapq.heappop(heap)
+            if closed[person]:
+                continue
+            if person == target:
+                return self.trace(parent_person, parent_movie, source, target)
+            closed[person] = 1
+            if stats is not None:
+                stats.expand(len(heap) + 1)
+            g = cost[person] + 1
+            for movie in movies_of(person):
+                if movie_cost[movie] != -1 and movie_cost[movie] <= g:
+                    continue
+                movie_cost[movie] = g
+                for star in stars_of(movie):
+                    if closed[star] or (cost[star] != -1 and cost[star] <= g):
+                        continue
+                    estimate = heuristic(star)
+                    if estimate is None:
+                        continue
+                    cost[star] = g
+                    parent_person[star] = person
+                    parent_movie[star] = movie
+                    heapq.heappush(heap, (g + estimate, -g, star))
+
+        return None
+
+    @staticmethod
+    def trace(parent_person, parent_movie, source, target):
+        """
+        Follows parent arrays back from target to source.
+        """
+        path = []
+        person = target
+        while person != source:
+            path.append((parent_movie[person], person))
+            person = parent_person[person]
+        path.reverse()
+        return path
+
+
+def read_rows(directory, filename, start=0):
+    """
+    Returns the rows of a CSV file in `directory` from byte offset
+    `start` onwards, as dictionaries, and the byte offset where they end.
+
+    When reading from an offset, only complete lines are returned, so a
+    row that is still being appended is picked up by the next read.
+    """
+    with open(os.path.join(directory, filename), "rb") as f:
+        header = f.readline()
+        if start:
+            f.seek(start)
+        else:
+            start = len(header)
+        data = f.read()
+
+    end = len(data) if start == len(header) else data.rfind(b"\n") + 1
+    fields = next(csv.reader([header.decode("utf-8")]))
+    rows = csv.DictReader(io.StringIO(data[:end].decode("utf-8")), fields)
+    return rows, start + end
+
+
+def sorted_order(strings):
+    """
+    Returns the indices of `strings` in sorted order, as an array.
+    """
+    return array(INDEX, sorted(range(len(strings)), key=strings.__getitem__))
+
+
+def find(table, order, value):
+    """
+    Returns the index of `value` in a StringTable by binary search over
+    its sorted `order`, or None if it is missing.
+    """
+    i = bisect_left(order, value, key=table.__getitem__)
+    if i < len(order) and table[order[i]] == value:
+        return order[i]
+    return table.extra_index.get(value)
+
+
+def build_csr(rows, sources, targets):
+    """
+    Returns (offsets, values) CSR arrays for `rows` rows from parallel
+    arrays of edge sources and targets.
+    """
+    offsets = array(OFFSET, [0]) * (rows + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(rows):
+        offsets[i + 1] += offsets[i]
+
+    values = array(INDEX, [0]) * len(targets)
+    cursor = offsets[:-1]
+    for source, target in zip(sources, targets):
+        values[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, values
+
+
+class StringTable(Sequence):
+    """
+    Immutable sequence of strings packed end to end into one UTF-8 buffer,
+    so a table can be saved and memory-mapped as two flat arrays.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+        # Strings appended after the table was packed, and their indices
+        self.extra = []
+        self.extra_index = {}
+
+    @classmethod
+    def from_strings(cls, strings):
+        offsets = array(OFFSET, [0])
+        data = bytearray()
+        for string in strings:
+            data += string.encode("utf-8")
+            offsets.append(len(data))
+        return cls(offsets, data)
+
+    def __getitem__(self, i):
+        packed = len(self.offsets) - 1
+        if 0 <= i < packed:
+            return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+        if packed <= i < packed + len(self.extra):
+            return self.extra[i - packed]
+        raise IndexError("string table index out of range")
+
+    def __len__(self):
+        return len(self.offsets) - 1 + len(self.extra)
+
+    def append(self, string):
+        self.extra_index.setdefault(string, len(self))
+        self.extra.append(string)
+
+
+class NamesView(Mapping):
+    """
+    Maps lowercased names to a set of corresponding person_ids,
+    looked up by binary search over the graph's name order.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        graph = self.graph
+        people = graph.people_named(name)
+        if not people:
+            raise KeyError(name)
+        return {graph.person_ids[person] for person in people}
+
+    def __iter__(self):
+        graph = self.graph
+        previous = None
+        for person in graph.name_order:
+            name = graph.person_names[person].lower()
+            if name != previous:
+                yield name
+                previous = name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class PeopleView(Mapping):
+    """
+    Maps person_ids to a dictionary of: name, birth, movies
+    (a set of movie_ids), built on demand from a Graph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[movie]
+                       for movie in graph.movies_of(person)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Maps movie_ids to a dictionary of: title, year, stars
+    (a set of person_ids), built on demand from a Graph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[person]
+                      for person in graph.stars_of(movie)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
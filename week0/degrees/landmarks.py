@@ -0,0 +1,230 @@
+"""
+Landmark distance oracle for degrees of separation.
+
+Breadth-first search is run once from each of a few well-connected
+"landmark" people, and the degrees from every landmark to every person
+are stored, one byte each, in a file next to the data. By the triangle
+inequality, for any landmark L and people a and b:
+
+    |d(L, a) - d(L, b)| <= d(a, b) <= d(L, a) + d(L, b)
+
+so bounds on the degrees between two people are answered without any
+search, and the lower bound is a consistent A* heuristic that prunes the
+exact search in degrees.shortest_path.
+
+Usage: python landmarks.py directory [--count N] [--workers N]
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+import snapshot
+from graph import Graph, UNREACHED
+
+MAGIC = b"DEGLMRK1"
+VERSION = 3
+FILENAME = "degrees.landmarks"
+
+# Graph used by worker processes
+worker_graph = None
+
+
+def landmarks_path(directory):
+    """
+    Returns the path of the landmarks file for a data directory.
+    """
+    return os.path.join(directory, FILENAME)
+
+
+def choose(graph, count):
+    """
+    Returns the indices of the `count` people with the most co-star
+    slots across their movies.
+    """
+    degree = []
+    for person in range(len(graph.person_ids)):
+        degree.append(sum(len(graph.stars_of(movie)) - 1
+                          for movie in graph.movies_of(person)))
+    ranked = sorted(range(len(degree)), key=degree.__getitem__, reverse=True)
+    return ranked[:count]
+
+
+def load_graph(directory):
+    """
+    Returns the graph for `directory`, from its snapshot if there is one,
+    with any rows appended to the CSV files since ingested on top.
+    """
+    graph = Graph()
+    if snapshot.load(graph, directory):
+        graph.ingest(directory)
+    else:
+        graph.load(directory)
+    return graph
+
+
+def init_worker(directory):
+    """
+    Loads the graph for `directory` into a worker process.
+    """
+    global worker_graph
+    worker_graph = load_graph(directory)
+
+
+def worker_distances(source):
+    return worker_graph.distances(source)
+
+
+def precompute(graph, directory, count=16, workers=None):
+    """
+    Computes distance vectors from `count` landmarks of `graph`, loaded
+    from `directory`, in parallel, and saves them next to the data.
+    Returns the resulting Landmarks.
+    """
+    chosen = choose(graph, count)
+    if workers == 1:
+        vectors = [graph.distances(source) for source in chosen]
+    else:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=init_worker,
+                                 initargs=(directory,)) as executor:
+            vectors = list(executor.map(worker_distances, chosen))
+
+    save(graph, directory, chosen, vectors)
+    return Landmarks(chosen, vectors)
+
+
+def save(graph, directory, chosen, vectors):
+    """
+    Writes landmark distance vectors for `graph` next to its data in
+    `directory`. The file is keyed on how far into each CSV file the
+    graph was read, and a checksum of the bytes before that, as for
+    snapshots, so it only matches a graph holding the same rows.
+    """
+    header = json.dumps({
+        "version": VERSION,
+        "sources": snapshot.source_marks(graph, directory),
+        "people": len(graph.person_ids),
+        "landmarks": [graph.person_ids[person] for person in chosen]
+    }).encode("utf-8")
+
+    path = landmarks_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for vector in vectors:
+                f.write(vector)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def load(graph, directory):
+    """
+    Memory-maps the landmarks saved for `directory` and returns them as
+    Landmarks, or returns None if there are none or they were computed
+    over different rows than `graph` holds.
+    """
+    try:
+        with open(landmarks_path(directory), "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(length))
+            if (header["version"] != VERSION
+                    or {name: mark[0] for name, mark
+                        in header["sources"].items()} != graph.sources
+                    or not snapshot.appended_only(directory,
+                                                  header["sources"])
+                    or header["people"] != len(graph.person_ids)):
+                return None
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+    people = header["people"]
+    start = len(MAGIC) + 8 + length
+    view = memoryview(buffer)
+    vectors = []
+    for i in range(len(header["landmarks"])):
+        begin = start + i * people
+        vectors.append(view[begin:begin + people])
+    chosen = [graph.person(person_id) for person_id in header["landmarks"]]
+    return Landmarks(chosen, vectors)
+
+
+class Landmarks():
+    """
+    Distance vectors from a set of landmark people.
+    """
+
+    def __init__(self, landmarks, vectors):
+        self.landmarks = landmarks
+        self.vectors = vectors
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees between two person
+        indices. The lower bound is math.inf if some landmark proves they
+        are not connected, and the upper bound is math.inf if no landmark
+        reaches both.
+        """
+        lower, upper = 0, math.inf
+        for vector in self.vectors:
+            a, b = vector[source], vector[target]
+            if a == UNREACHED and b == UNREACHED:
+                continue
+            if a == UNREACHED or b == UNREACHED:
+                return math.inf, math.inf
+            lower = max(lower, abs(a - b))
+            upper = min(upper, a + b)
+        return lower, upper
+
+    def heuristic(self, target):
+        """
+        Returns an A* heuristic for Graph.astar_path towards `target`.
+        """
+        columns = [(vector, vector[target]) for vector in self.vectors]
+
+        def estimate(person):
+            best = 0
+            for vector, to_target in columns:
+                a = vector[person]
+                if a == UNREACHED or to_target == UNREACHED:
+                    if a != to_target:
+                        return None
+                    continue
+                if abs(a - to_target) > best:
+                    best = abs(a - to_target)
+            return best
+
+        return estimate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--count", type=int, default=16,
+                        help="number of landmarks")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (1 runs in-process)")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    graph = load_graph(args.directory)
+    print("Computing landmarks...")
+    landmarks = precompute(graph, args.directory, args.count, args.workers)
+    print(f"{len(landmarks.landmarks)} landmarks written to "
+          f"{landmarks_path(args.directory)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Prefix and fuzzy name lookup for the degrees graph.
+
+Names are grouped into distinct lowercased names in sorted order, so
+prefix completion is a binary search. Fuzzy lookup uses a trigram index
+over the distinct names: a name within k edits of the query shares all
+but at most 3k of the query's trigrams, so only names sharing enough
+trigrams are checked with a bounded edit distance.
+"""
+
+from bisect import bisect_left
+
+
+def gram_code(gram):
+    """
+    Packs a three-character string into one integer.
+    """
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+def grams(name):
+    """
+    Returns the set of trigram codes of a name, padded so that the
+    start and end of the name form trigrams too.
+    """
+    padded = f"  {name} "
+    return {gram_code(padded[i:i + 3]) for i in range(len(padded) - 2)}
+
+
+def build(names):
+    """
+    Builds the index from the lowercased names of all people, listed in
+    sorted order. Returns a dictionary of integer lists:
+
+    name_groups: where each distinct name starts in the sorted order,
+                 followed by the total number of names
+    gram_keys: the sorted trigram codes
+    gram_offsets, gram_names: CSR postings of distinct names per trigram
+    """
+    groups = []
+    previous = None
+    postings = {}
+    for i, name in enumerate(names):
+        if name == previous:
+            continue
+        previous = name
+        for gram in grams(name):
+            postings.setdefault(gram, []).append(len(groups))
+        groups.append(i)
+    groups.append(len(names))
+
+    keys = sorted(postings)
+    offsets = [0]
+    values = []
+    for key in keys:
+        values.extend(postings[key])
+        offsets.append(len(values))
+
+    return {
+        "name_groups": groups,
+        "gram_keys": keys,
+        "gram_offsets": offsets,
+        "gram_names": values
+    }
+
+
+def distinct_names(graph):
+    """
+    Returns the number of distinct lowercased names in a graph.
+    """
+    return len(graph.name_groups) - 1
+
+
+def distinct_name(graph, group):
+    """
+    Returns the lowercased name of a distinct name group.
+    """
+    person = graph.name_order[graph.name_groups[group]]
+    return graph.person_names[person].lower()
+
+
+def complete(graph, prefix, limit=10):
+    """
+    Returns up to `limit` distinct lowercased names starting with
+    `prefix`, in alphabetical order.
+    """
+    prefix = prefix.lower()
+    key = lambda group: distinct_name(graph, group)
+    group = bisect_left(range(distinct_names(graph)), prefix, key=key)
+    matches = []
+    while (len(matches) < limit and group < distinct_names(graph)
+           and key(group).startswith(prefix)):
+        matches.append(key(group))
+        group += 1
+
+    # People added by Graph.ingest are not indexed, so check them directly
+    extra = [name for name in graph.extra_names
+             if name.startswith(prefix) and name not in matches]
+    return sorted(matches + extra)[:limit]
+
+
+def edit_distance(a, b, bound):
+    """
+    Returns the Levenshtein distance between a and b,
+    or bound + 1 if it is larger than bound.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return min(previous[-1], bound + 1)
+
+
+def fuzzy(graph, name, max_distance=2, limit=10):
+    """
+    Returns up to `limit` (distance, name) pairs for distinct lowercased
+    names within `max_distance` edits of `name`, closest first.
+
+    Candidates must share at least one trigram with the query, so very
+    short queries may miss matches that share none.
+    """
+    name = name.lower()
+    query = grams(name)
+    keys = graph.gram_keys
+    offsets = graph.gram_offsets
+    postings = graph.gram_names
+
+    # Count how many trigrams each distinct name shares with the query
+    shared = {}
+    for gram in query:
+        i = bisect_left(keys, gram)
+        if i == len(keys) or keys[i] != gram:
+            continue
+        for group in postings[offsets[i]:offsets[i + 1]]:
+            shared[group] = shared.get(group, 0) + 1
+
+    threshold = max(1, len(query) - 3 * max_distance)
+    candidates = {distinct_name(graph, group)
+                  for group, count in shared.items() if count >= threshold}
+
+    # People added by Graph.ingest are not indexed, so check them all
+    candidates.update(graph.extra_names)
+
+    matches = []
+    for candidate in candidates:
+        distance = edit_distance(name, candidate, max_distance)
+        if distance <= max_distance:
+            matches.append((distance, candidate))
+
+    matches.sort()
+    return matches[:limit]
@@ -0,0 +1,383 @@
+"""
+Long-running degrees query server.
+
+Loads the graph once and answers queries over HTTP, either on a TCP port
+or on a Unix socket, with one thread per request:
+
+    GET /path?source=<person_id>&target=<person_id>
+    GET /person?name=<name>
+    GET /stats
+    POST /ingest
+
+Recent paths are kept in an LRU cache keyed on the unordered pair of
+people, so a lookup from target to source is answered from the same
+entry as the original query.
+
+/ingest adds rows appended to the CSV files since they were loaded, and
+drops only the cached paths the new connections could shorten.
+
+Usage: python server.py [directory] [--port N | --socket PATH]
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+from graph import UNREACHED
+
+
+def reverse_path(source, path):
+    """
+    Returns a (movie_id, person_id) path from source to target
+    as the equivalent path from target back to source.
+    """
+    people = [source] + [person for _, person in path]
+    return [(path[i][0], people[i]) for i in range(len(path) - 1, -1, -1)]
+
+
+class PathCache():
+    """
+    Thread-safe LRU cache of shortest paths, keyed on unordered pairs.
+    """
+
+    def __init__(self, capacity=10_000):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(source, target):
+        return (source, target) if source <= target else (target, source)
+
+    def get(self, source, target):
+        """
+        Returns (True, path) for a cached pair, or (False, None).
+        Paths are stored from the smaller person_id of the pair,
+        and reversed on the way out when needed.
+        """
+        key = self.key(source, target)
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            path = self.entries[key]
+        if path is not None and source != key[0]:
+            path = reverse_path(key[0], path)
+        return True, path
+
+    def put(self, source, target, path):
+        key = self.key(source, target)
+        if path is not None and source != key[0]:
+            path = reverse_path(source, path)
+        with self.lock:
+            self.entries[key] = path
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, stale):
+        """
+        Drops every entry for which stale(source, target, path) is true,
+        and returns how many were dropped.
+        """
+        with self.lock:
+            keys = [key for key, path in self.entries.items()
+                    if stale(key[0], key[1], path)]
+            for key in keys:
+                del self.entries[key]
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+class Latency():
+    """
+    Thread-safe request counter and latency tracker for one endpoint.
+    Percentiles are taken over a window of the most recent requests.
+    """
+
+    def __init__(self, window=1000):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def record(self, seconds):
+        with self.lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self.recent.append(seconds)
+
+    def stats(self):
+        with self.lock:
+            recent = sorted(self.recent)
+            count, total, maximum = self.count, self.total, self.max
+
+        def percentile(p):
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(p * len(recent)))]
+
+        return {
+            "count": count,
+            "mean_ms": 1000 * total / count if count else 0.0,
+            "p50_ms": 1000 * percentile(0.50),
+            "p95_ms": 1000 * percentile(0.95),
+            "p99_ms": 1000 * percentile(0.99),
+            "max_ms": 1000 * maximum
+        }
+
+
+class ReadWriteLock():
+    """
+    Lets any number of readers hold the lock at once, or a single writer.
+    Waiting writers keep new readers out, so they are not starved.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writers = 0
+        self.writing = False
+
+    @contextmanager
+    def read(self):
+        with self.condition:
+            while self.writing or self.writers:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                self.condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self.condition:
+            self.writers += 1
+            while self.writing or self.readers:
+                self.condition.wait()
+            self.writers -= 1
+            self.writing = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+
+class QueryService():
+    """
+    Answers queries against the loaded degrees graph.
+    """
+
+    def __init__(self, directory, mode="bidirectional", cache_size=10_000):
+        self.directory = directory
+        self.mode = mode
+        self.cache = PathCache(cache_size)
+        self.lock = ReadWriteLock()
+        self.latency = {"path": Latency(), "person": Latency(),
+                        "ingest": Latency()}
+        self.started = time.time()
+
+    def path(self, source, target):
+        start = time.perf_counter()
+        with self.lock.read():
+            hit, path = self.cache.get(source, target)
+            if not hit:
+                if source in degrees.people and target in degrees.people:
+                    path = degrees.shortest_path(source, target, mode=self.mode)
+                else:
+                    path = None
+                self.cache.put(source, target, path)
+        self.latency["path"].record(time.perf_counter() - start)
+
+        return {
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": None if path is None else [
+                {"movie_id": movie, "person_id": person}
+                for movie, person in path
+            ],
+            "cached": hit
+        }
+
+    def person(self, name):
+        start = time.perf_counter()
+        with self.lock.read():
+            person_ids = sorted(degrees.names.get(name.lower(), set()))
+            matches = []
+            for person_id in person_ids:
+                person = degrees.people[person_id]
+                matches.append({"person_id": person_id,
+                                "name": person["name"],
+                                "birth": person["birth"]})
+        self.latency["person"].record(time.perf_counter() - start)
+        return {"name": name, "matches": matches}
+
+    def ingest(self):
+        """
+        Adds rows appended to the CSV files, then drops cached paths that
+        the new connections may have shortened or created.
+
+        With d the degrees from the nearest person whose co-stars changed,
+        any new shortcut between a and b is at least d(a) + 1 + d(b) long,
+        so entries with a path no longer than that are still shortest.
+        """
+        start = time.perf_counter()
+        with self.lock.write():
+            touched = degrees.ingest(self.directory)
+            invalidated = 0
+            if touched:
+                graph = degrees.graph
+                distance = graph.distances(
+                    *[graph.person(person_id) for person_id in touched]
+                )
+
+                def stale(source, target, path):
+                    a, b = graph.person(source), graph.person(target)
+                    if a is None or b is None:
+                        return False
+                    if UNREACHED in (distance[a], distance[b]):
+                        return False
+                    if path is None:
+                        return True
+                    return distance[a] + 1 + distance[b] < len(path)
+
+                invalidated = self.cache.invalidate(stale)
+        self.latency["ingest"].record(time.perf_counter() - start)
+        return {"people_touched": len(touched), "invalidated": invalidated}
+
+    def stats(self):
+        return {
+            "uptime_s": time.time() - self.started,
+            "people": len(degrees.people),
+            "movies": len(degrees.movies),
+            "mode": self.mode,
+            "cache": self.cache.stats(),
+            "latency": {name: latency.stats()
+                        for name, latency in self.latency.items()}
+        }
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == "/path":
+                body = self.service.path(query["source"], query["target"])
+            elif url.path == "/person":
+                body = self.service.person(query["name"])
+            elif url.path == "/stats":
+                body = self.service.stats()
+            else:
+                return self.reply(404, {"error": f"unknown endpoint {url.path}"})
+        except KeyError as e:
+            return self.reply(400, {"error": f"missing parameter {e}"})
+        self.reply(200, body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/ingest":
+            return self.reply(404, {"error": f"unknown endpoint {url.path}"})
+        self.reply(200, self.service.ingest())
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn,
+                              socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def make_server(service, port=8000, socket_path=None):
+    """
+    Returns an HTTP server for `service`, listening on a Unix socket if
+    `socket_path` is given and on localhost:`port` otherwise.
+    """
+    handler = type("Handler", (QueryHandler,), {"service": service})
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return ThreadingUnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--socket", help="serve on a Unix socket instead")
+    parser.add_argument("--mode", choices=degrees.MODES,
+                        default="bidirectional")
+    parser.add_argument("--cache-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    print("Data loaded.")
+
+    service = QueryService(args.directory, mode=args.mode,
+                           cache_size=args.cache_size)
+    server = make_server(service, args.port, args.socket)
+    print(f"Serving on {args.socket or f'http://127.0.0.1:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Binary snapshot cache for the degrees graph.
+
+A snapshot holds every column of a Graph as a flat, 8-byte aligned
+section of one file, behind a small JSON header. Loading a snapshot
+memory-maps the file and casts each section in place, so no CSV parsing
+and almost no copying happens at startup. The header records the size
+and modification time of the CSV files it was built from, and a
+snapshot that no longer matches them is ignored and rebuilt.
+
+The one exception is a CSV file that has only had rows appended: the
+header also keeps a checksum of every byte of the file the snapshot
+covers, and if the file has grown and those bytes are unchanged, the
+snapshot stays valid and only the appended rows need to be ingested on
+top of it. The checksum is only recomputed when a file's size or
+modification time has changed, and costs one sequential read of the
+file, far less than parsing it.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from graph import Graph, StringTable, OFFSET
+
+MAGIC = b"DEGSNAP1"
+VERSION = 4
+ALIGNMENT = 8
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Number of bytes read at a time when checksumming a source CSV file
+CHECKSUM_CHUNK = 1 << 20
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot file for a data directory.
+    """
+    return os.path.join(directory, FILENAME)
+
+
+def source_stamps(directory):
+    """
+    Returns [size, mtime_ns] for each source CSV file in a directory.
+    """
+    stamps = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps[name] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def checksum(directory, name, offset):
+    """
+    Returns a checksum of the first `offset` bytes of a source CSV file,
+    used to recognise a file that has only been appended to.
+    """
+    crc = 0
+    with open(os.path.join(directory, name), "rb") as f:
+        while offset > 0:
+            chunk = f.read(min(offset, CHECKSUM_CHUNK))
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            offset -= len(chunk)
+    return crc
+
+
+def source_marks(graph, directory):
+    """
+    Returns [offset, size, mtime_ns, checksum] for each source CSV file,
+    where `offset` is where the rows loaded into `graph` end.
+    """
+    marks = {}
+    for name, (size, mtime) in source_stamps(directory).items():
+        offset = graph.sources[name]
+        marks[name] = [offset, size, mtime, checksum(directory, name, offset)]
+    return marks
+
+
+def appended_only(directory, marks):
+    """
+    Returns True if every source CSV file is unchanged since `marks`
+    were taken, apart from rows appended to its end.
+    """
+    stamps = source_stamps(directory)
+    for name, (offset, size, mtime, crc) in marks.items():
+        if stamps[name] == [size, mtime]:
+            continue
+        if (stamps[name][0] <= size
+                or checksum(directory, name, offset) != crc):
+            return False
+    return True
+
+
+def columns(graph):
+    """
+    Yields (name, buffer, typecode) for every column of a graph.
+    """
+    for name in Graph.TABLES:
+        table = getattr(graph, name)
+        yield f"{name}.offsets", table.offsets, OFFSET
+        yield f"{name}.data", table.data, "B"
+    for name, typecode in Graph.ARRAYS.items():
+        yield name, getattr(graph, name), typecode
+
+
+def save(graph, directory):
+    """
+    Writes a snapshot of `graph` for the CSV files in `directory`.
+    The file is replaced atomically, so readers never see a partial write.
+    Rows ingested on top of the CSR arrays cannot be saved.
+    """
+    if graph.has_extras():
+        raise ValueError("graph has ingested rows")
+
+    sections = []
+    offset = 0
+    for name, buffer, typecode in columns(graph):
+        size = memoryview(buffer).nbytes
+        sections.append([name, typecode, offset, size])
+        offset += size + (-size % ALIGNMENT)
+
+    header = json.dumps({
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "sources": source_marks(graph, directory),
+        "sections": sections
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % ALIGNMENT)
+
+    path = snapshot_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for name, buffer, typecode in columns(graph):
+                data = memoryview(buffer).cast("B")
+                f.write(data)
+                f.write(b"\0" * (-len(data) % ALIGNMENT))
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def read_header(f):
+    """
+    Returns the decoded header of an open snapshot file, and the file
+    offset of its first section. Raises ValueError if it is not a
+    snapshot this version can read.
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a degrees snapshot")
+    (length,) = struct.unpack("<Q", f.read(8))
+    header = json.loads(f.read(length))
+    if header["version"] != VERSION or header["byteorder"] != sys.byteorder:
+        raise ValueError("incompatible snapshot")
+    return header, len(MAGIC) + 8 + length
+
+
+def load(graph, directory):
+    """
+    Memory-maps the snapshot for `directory` into `graph`.
+
+    Returns True on success, or False if there is no snapshot or it is
+    stale, in which case `graph` is left untouched. Rows appended to the
+    CSV files after the snapshot was taken are not loaded; pass the
+    graph to Graph.ingest to add them.
+    """
+    path = snapshot_path(directory)
+    try:
+        with open(path, "rb") as f:
+            header, start = read_header(f)
+            if not appended_only(directory, header["sources"]):
+                return False
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, KeyError, struct.error):
+        return False
+
+    view = memoryview(buffer)
+    sections = {}
+    for name, typecode, offset, size in header["sections"]:
+        begin = start + offset
+        sections[name] = view[begin:begin + size].cast(typecode)
+    if set(sections) != {name for name, _, _ in columns(graph)}:
+        return False
+
+    graph.clear()
+    for name in Graph.TABLES:
+        setattr(graph, name, StringTable(sections[f"{name}.offsets"],
+                                         sections[f"{name}.data"]))
+    for name in Graph.ARRAYS:
+        setattr(graph, name, sections[name])
+    graph.sources = {name: mark[0] for name, mark in header["sources"].items()}
+    return True
@@ -1,4 +1,10 @@
+import time
+from collections import deque
+
+
 class Node():
+    __slots__ = ("person", "movie", "parent")
+
     def __init__(self, person, movie, parent):
         self.person = person
         self.movie = movie
@@ -36,3 +42,94 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Stack frontier with constant-time add, remove and contains_state.
+
+    Nodes live in a deque, and a count of the nodes per person is kept
+    alongside so membership never has to scan the frontier.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def __len__(self):
+        return len(self.frontier)
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.person] = self.states.get(node.person, 0) + 1
+
+    def contains_state(self, person):
+        return person in self.states
+
+    def empty(self):
+        return not self.frontier
+
+    def _pop(self):
+        return self.frontier.pop()
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        node = self._pop()
+        count = self.states[node.person] - 1
+        if count:
+            self.states[node.person] = count
+        else:
+            del self.states[node.person]
+        return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def _pop(self):
+        return self.frontier.popleft()
+
+
+class SearchStats():
+    """
+    Counters filled in by a search when passed as its `stats` argument.
+
+    expansions: people whose neighbors were generated
+    peak_frontier: largest number of people waiting in the frontier
+    neighbor_time: seconds spent generating neighbors
+    wall_time: seconds spent in the whole search
+    """
+
+    def __init__(self):
+        self.expansions = 0
+        self.peak_frontier = 0
+        self.neighbor_time = 0.0
+        self.wall_time = 0.0
+
+    def expand(self, frontier_size):
+        """
+        Records one expansion, with the frontier size before it.
+        """
+        self.expansions += 1
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+
+    def timed(self, function):
+        """
+        Returns `function` wrapped to add its running time to neighbor_time.
+        """
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.neighbor_time += time.perf_counter() - start
+        return wrapper
+
+    def as_dict(self):
+        return {
+            "expansions": self.expansions,
+            "peak_frontier": self.peak_frontier,
+            "neighbor_time": self.neighbor_time,
+            "wall_time": self.wall_time
+        }
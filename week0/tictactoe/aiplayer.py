@@ -0,0 +1,138 @@
+"""
+Background AI player for runner.py.
+
+The AI's moves are computed in a separate worker process, so the window
+keeps drawing and handling events while the computer thinks. The render
+loop starts a search with AIPlayer.start and calls AIPlayer.poll every
+frame until the move arrives; resetting the game calls AIPlayer.cancel,
+which stops a running search outright instead of waiting for it to
+finish.
+
+The worker lives across moves and games, so state the search keeps
+between calls, such as tictactoe's transposition table, stays warm. It
+is only replaced when a search is cancelled part way through. Because
+the worker may be started with the "spawn" or "forkserver" method, which
+re-import the main script, the script must start its game loop behind an
+`if __name__ == "__main__":` guard.
+"""
+
+import multiprocessing
+import time
+
+
+def serve(choose, connection):
+    """
+    Answers each board received over `connection` with choose(board),
+    or the exception it raised, until it receives None or the connection
+    is closed.
+    """
+    try:
+        while True:
+            try:
+                board = connection.recv()
+            except EOFError:
+                break
+            if board is None:
+                break
+            try:
+                connection.send((True, choose(board)))
+            except Exception as e:
+                connection.send((False, e))
+    finally:
+        connection.close()
+
+
+class AIPlayer():
+    """
+    Computes moves with `choose(board)` in a background worker process.
+
+    `choose` must be a module-level function, such as tictactoe.minimax,
+    so that it can be sent to the process. A move is not handed over
+    until `delay` seconds after the search started, so that quick
+    searches still look like the computer is thinking.
+    """
+
+    def __init__(self, choose, delay=0.5):
+        self.choose = choose
+        self.delay = delay
+        self.process = None
+        self.connection = None
+        self.started = None
+
+    @property
+    def thinking(self):
+        """
+        True if a search has been started and its move not yet collected.
+        """
+        return self.started is not None
+
+    def start(self, board):
+        """
+        Starts searching for a move on `board`, cancelling any search
+        already running.
+        """
+        self.cancel()
+        if self.process is None:
+            self.connection, child = multiprocessing.Pipe()
+            self.process = multiprocessing.Process(
+                target=serve, args=(self.choose, child), daemon=True
+            )
+            self.process.start()
+            child.close()
+        self.connection.send(board)
+        self.started = time.monotonic()
+
+    def poll(self):
+        """
+        Returns the move if the search has finished, or None if it is
+        still running. Never blocks.
+        """
+        if self.started is None:
+            return None
+        if time.monotonic() - self.started < self.delay:
+            return None
+        if not self.connection.poll():
+            if not self.process.is_alive() and not self.connection.poll():
+                self.stop()
+                raise RuntimeError("AI process exited without a move")
+            return None
+
+        ok, value = self.connection.recv()
+        self.started = None
+        if not ok:
+            raise value
+        return value
+
+    def cancel(self):
+        """
+        Stops the current search, if any, and discards its move. The
+        worker is only stopped if it is still searching.
+        """
+        if self.started is None:
+            return
+        if self.connection.poll():
+            self.connection.recv()
+            self.started = None
+        else:
+            self.stop()
+
+    def stop(self):
+        """
+        Stops the worker process, abandoning any search in progress.
+        """
+        if self.process is None:
+            return
+        if self.started is not None and self.process.is_alive():
+            self.process.terminate()
+        else:
+            # A forked worker holds a copy of our end of the pipe, so it
+            # would never see it close; ask it to exit instead
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+        self.connection.close()
+        self.process.join()
+        self.process = None
+        self.connection = None
+        self.started = None
@@ -0,0 +1,58 @@
+"""
+Benchmark full game-tree walks with list boards and with bitboards.
+
+Every position reachable from the empty board is visited, without
+memoization or pruning, once through the list-board functions in
+tictactoe.py and once through the bitboard functions in bitboard.py,
+and the number of positions visited per second is reported.
+"""
+
+import sys
+import time
+
+import bitboard
+import tictactoe as ttt
+
+
+def walk_lists(board):
+    """
+    Returns the number of positions in the game tree below a list board.
+    """
+    if ttt.terminal(board):
+        return 1
+    return 1 + sum(walk_lists(ttt.result(board, action))
+                   for action in ttt.actions(board))
+
+
+def walk_bits(state):
+    """
+    Returns the number of positions in the game tree below a bitboard.
+    """
+    x, o = state
+    if (bitboard.WINNING[x] or bitboard.WINNING[o]
+            or x | o == bitboard.FULL):
+        return 1
+    return 1 + sum(walk_bits(bitboard.play(state, cell))
+                   for cell in bitboard.moves(state))
+
+
+def measure(name, walk, start_state):
+    start = time.perf_counter()
+    positions = walk(start_state)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>10}: {positions} positions in {elapsed:.3f}s "
+          f"({positions / elapsed:,.0f} positions/s)")
+    return positions
+
+
+def main():
+    if len(sys.argv) > 1:
+        sys.exit("Usage: python benchmark.py")
+    lists = measure("lists", walk_lists, ttt.initial_state())
+    bits = measure("bitboard", walk_bits, (0, 0))
+    if lists != bits:
+        sys.exit("Position counts differ.")
+
+
+if __name__ == "__main__":
+    main()
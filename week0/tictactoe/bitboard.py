@@ -0,0 +1,225 @@
+"""
+Bitboard Tic Tac Toe Player
+
+A state is a pair of 9-bit ints (x, o) holding the cells taken by each
+player, where cell (i, j) is bit 3 * i + j. Making a move is a single OR,
+and a player has won if their bits cover one of eight win masks, which is
+looked up in a precomputed table of all 512 bit patterns.
+
+The functions named like those in tictactoe.py take and return list
+boards, so this module can stand in for tictactoe in runner.py; they
+convert with encode and decode and do their work on bitboards.
+"""
+
+import math
+
+from tictactoe import X, O, EMPTY
+
+# All nine cells
+FULL = 0b111_111_111
+
+# Rows, columns and diagonals
+WIN_MASKS = (
+    0b000_000_111, 0b000_111_000, 0b111_000_000,
+    0b001_001_001, 0b010_010_010, 0b100_100_100,
+    0b100_010_001, 0b001_010_100
+)
+
+# WINNING[bits] is 1 if a player holding `bits` has three in a row
+WINNING = bytes(
+    any(bits & mask == mask for mask in WIN_MASKS) for bits in range(512)
+)
+
+# Maps a state to its minimax value, shared by every search
+values = {}
+
+
+def encode(board):
+    """
+    Returns the bitboard state for a list board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def decode(state):
+    """
+    Returns the list board for a bitboard state.
+    """
+    x, o = state
+    board = [[EMPTY, EMPTY, EMPTY] for _ in range(3)]
+    for cell in range(9):
+        if x >> cell & 1:
+            board[cell // 3][cell % 3] = X
+        elif o >> cell & 1:
+            board[cell // 3][cell % 3] = O
+    return board
+
+
+def x_to_move(state):
+    """
+    Returns True if X has the next turn in a state.
+    """
+    x, o = state
+    return x.bit_count() <= o.bit_count()
+
+
+def moves(state):
+    """
+    Yields the cells that are still empty in a state.
+    """
+    empty = FULL & ~(state[0] | state[1])
+    while empty:
+        bit = empty & -empty
+        yield bit.bit_length() - 1
+        empty ^= bit
+
+
+def play(state, cell):
+    """
+    Returns the state after the player to move takes a cell.
+    """
+    x, o = state
+    if x_to_move(state):
+        return x | (1 << cell), o
+    return x, o | (1 << cell)
+
+
+def state_winner(state):
+    """
+    Returns X or O if that player has won in a state, or None.
+    """
+    if WINNING[state[0]]:
+        return X
+    if WINNING[state[1]]:
+        return O
+    return None
+
+
+def state_value(state):
+    """
+    Returns the minimax value of a state: 1 if X wins with best play,
+    -1 if O does, and 0 for a tie.
+    """
+    value = values.get(state)
+    if value is not None:
+        return value
+
+    x, o = state
+    if WINNING[x]:
+        value = 1
+    elif WINNING[o]:
+        value = -1
+    elif x | o == FULL:
+        value = 0
+    elif x_to_move(state):
+        value = -1
+        for cell in moves(state):
+            value = max(value, state_value(play(state, cell)))
+            if value == 1:
+                break
+    else:
+        value = 1
+        for cell in moves(state):
+            value = min(value, state_value(play(state, cell)))
+            if value == -1:
+                break
+
+    values[state] = value
+    return value
+
+
+def best_move(state):
+    """
+    Returns the optimal cell for the player to move, or None if the game
+    is over.
+    """
+    x, o = state
+    if WINNING[x] or WINNING[o] or x | o == FULL:
+        return None
+
+    maximizing = x_to_move(state)
+    best, move = (-math.inf, None) if maximizing else (math.inf, None)
+    for cell in moves(state):
+        value = state_value(play(state, cell))
+        if maximizing and value > best or not maximizing and value < best:
+            best, move = value, cell
+    return move
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return decode((0, 0))
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return X if x_to_move(encode(board)) else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {(cell // 3, cell % 3) for cell in moves(encode(board))}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3):
+        raise Exception("Out-of-bound moves")
+    state = encode(board)
+    cell = 3 * i + j
+    if (state[0] | state[1]) >> cell & 1:
+        raise Exception("Invalid move.")
+    return decode(play(state, cell))
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    return state_winner(encode(board))
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = encode(board)
+    return bool(WINNING[x] or WINNING[o] or x | o == FULL)
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = encode(board)
+    if WINNING[x]:
+        return 1
+    if WINNING[o]:
+        return -1
+    return 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    cell = best_move(encode(board))
+    if cell is None:
+        return None
+    return cell // 3, cell % 3
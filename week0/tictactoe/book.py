@@ -0,0 +1,148 @@
+"""
+Opening book for Tic Tac Toe.
+
+Every position reachable from the empty board is solved once and the
+optimal move is stored for it. Positions are first reduced by the eight
+symmetries of the board (four rotations, each optionally mirrored), so
+the book only holds one canonical position out of every symmetry class.
+
+A position is a pair of 9-bit ints (x, o), as in bitboard.py, where cell
+(i, j) is bit 3 * i + j. The book is read lazily on the first lookup, so
+importing this module costs nothing. Regenerate it with:
+
+    python book.py
+"""
+
+import os
+import struct
+from array import array
+
+MAGIC = b"TTTBOOK1"
+FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+
+def symmetries():
+    """
+    Returns the eight symmetries of the board, each as a list mapping
+    every cell to the cell it is moved to.
+    """
+    def rotate(i, j):
+        return j, 2 - i
+
+    def mirror(i, j):
+        return i, 2 - j
+
+    permutations = []
+    for mirrored in (False, True):
+        for turns in range(4):
+            permutation = []
+            for cell in range(9):
+                i, j = divmod(cell, 3)
+                if mirrored:
+                    i, j = mirror(i, j)
+                for _ in range(turns):
+                    i, j = rotate(i, j)
+                permutation.append(3 * i + j)
+            permutations.append(permutation)
+    return permutations
+
+
+SYMMETRIES = symmetries()
+
+# transforms[s][bits] is the 9-bit pattern `bits` under symmetry s,
+# built on first use
+transforms = None
+
+# Maps canonical position codes to optimal moves, once loaded
+book = None
+
+
+def canonical(x, o):
+    """
+    Returns (code, symmetry) for a position, where `code` is the smallest
+    x | o << 9 over all symmetries and `symmetry` is the one giving it.
+    """
+    global transforms
+    if transforms is None:
+        transforms = [
+            [sum(1 << permutation[cell]
+                 for cell in range(9) if bits >> cell & 1)
+             for bits in range(512)]
+            for permutation in SYMMETRIES
+        ]
+    return min((transforms[s][x] | transforms[s][o] << 9, s)
+               for s in range(len(SYMMETRIES)))
+
+
+def load(filename=FILENAME):
+    """
+    Returns the book in `filename` as a dictionary, or an empty
+    dictionary if there is no book file.
+    """
+    try:
+        with open(filename, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return {}
+            (count,) = struct.unpack("<I", f.read(4))
+            codes = array("I")
+            codes.frombytes(f.read(4 * count))
+            moves = f.read(count)
+    except OSError:
+        return {}
+    return dict(zip(codes, moves))
+
+
+def lookup(x, o):
+    """
+    Returns the optimal cell to play in a position,
+    or None if the position is not in the book.
+    """
+    global book
+    if book is None:
+        book = load()
+
+    code, s = canonical(x, o)
+    move = book.get(code)
+    if move is None:
+        return None
+    return SYMMETRIES[s].index(move)
+
+
+def generate(filename=FILENAME):
+    """
+    Solves every reachable position that is not over, and writes the
+    canonical ones with their optimal moves to `filename`. Returns the
+    number of positions written.
+    """
+    import bitboard
+
+    entries = {}
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        state = stack.pop()
+        if state in seen:
+            continue
+        seen.add(state)
+        move = bitboard.best_move(state)
+        if move is None:
+            continue
+
+        code, s = canonical(*state)
+        if code not in entries:
+            canonical_state = (code & 0x1FF, code >> 9)
+            entries[code] = bitboard.best_move(canonical_state)
+        for cell in bitboard.moves(state):
+            stack.append(bitboard.play(state, cell))
+
+    codes = array("I", sorted(entries))
+    with open(filename, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(codes)))
+        f.write(codes.tobytes())
+        f.write(bytes(entries[code] for code in codes))
+    return len(codes)
+
+
+if __name__ == "__main__":
+    print(f"{generate()} positions written to {FILENAME}.")
@@ -0,0 +1,332 @@
+"""
+m,n,k-game Player
+
+Tic Tac Toe generalised to an m x n board where k in a row wins, such as
+4 x 4 with k = 4, or gomoku on 15 x 15 with k = 5. Boards are lists of
+lists as in tictactoe.py, and their size is read from the board itself.
+
+Exhaustive search is hopeless on large boards, so the AI runs an
+iterative-deepening alpha-beta search within a per-move time budget,
+ordering moves by killer moves and the history heuristic, and scoring
+the positions where it stops with a pluggable evaluation function.
+"""
+
+import math
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Directions to look along for k in a row
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Score of a won position, well above anything an evaluation returns
+WIN = 1_000_000
+
+
+def initial_state(m=3, n=3):
+    """
+    Returns starting state of an m x n board.
+    """
+    return [[EMPTY] * n for _ in range(m)]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x_moves = sum(row.count(X) for row in board)
+    o_moves = sum(row.count(O) for row in board)
+    return O if x_moves > o_moves else X
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {(i, j)
+            for i, row in enumerate(board)
+            for j, cell in enumerate(row) if cell == EMPTY}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if not (0 <= i < len(board) and 0 <= j < len(board[0])):
+        raise Exception("Out-of-bound moves")
+    if board[i][j] != EMPTY:
+        raise Exception("Invalid move.")
+    new_board = [row[:] for row in board]
+    new_board[i][j] = player(board)
+    return new_board
+
+
+def wins(board, action, k=3):
+    """
+    Returns True if the mark at `action` is part of k in a row.
+
+    Only the lines through that cell are checked, so after each move
+    this detects a win in O(k) instead of scanning the whole board.
+    """
+    i, j = action
+    mark = board[i][j]
+    if mark == EMPTY:
+        return False
+    m, n = len(board), len(board[0])
+    for di, dj in DIRECTIONS:
+        count = 1
+        for sign in (1, -1):
+            y, x = i + sign * di, j + sign * dj
+            while 0 <= y < m and 0 <= x < n and board[y][x] == mark:
+                count += 1
+                y, x = y + sign * di, x + sign * dj
+        if count >= k:
+            return True
+    return False
+
+
+def winner(board, k=3):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell != EMPTY and wins(board, (i, j), k):
+                return cell
+    return None
+
+
+def terminal(board, k=3):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    if winner(board, k) is not None:
+        return True
+    return all(cell != EMPTY for row in board for cell in row)
+
+
+def utility(board, k=3):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    won = winner(board, k)
+    if won == X:
+        return 1
+    elif won == O:
+        return -1
+    return 0
+
+
+def windows(m, n, k):
+    """
+    Returns every line of k cells on an m x n board, as lists of (i, j).
+    """
+    lines = []
+    for i in range(m):
+        for j in range(n):
+            for di, dj in DIRECTIONS:
+                end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                if 0 <= end_i < m and 0 <= end_j < n:
+                    lines.append([(i + s * di, j + s * dj) for s in range(k)])
+    return lines
+
+
+def line_evaluation(board, mark, k, lines):
+    """
+    Default evaluation: every line of k cells that only one player has
+    marks in is worth 10 ** (marks in it) to that player. Returns the
+    score for `mark` minus the score for the opponent.
+    """
+    score = 0
+    for line in lines:
+        mine = theirs = 0
+        for i, j in line:
+            cell = board[i][j]
+            if cell == mark:
+                mine += 1
+            elif cell != EMPTY:
+                theirs += 1
+        if mine and not theirs:
+            score += 10 ** mine
+        elif theirs and not mine:
+            score -= 10 ** theirs
+    return score
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Search():
+    """
+    Time-bounded iterative-deepening alpha-beta search for one move.
+
+    `evaluate(board, mark, k, lines)` scores a position for `mark`, where
+    `lines` are the board's windows of k cells. Candidate moves are the
+    empty cells within `radius` of a mark, since moves far from all
+    play are never better on large boards; on small boards this covers
+    every empty cell.
+    """
+
+    def __init__(self, k=3, time_limit=1.0, evaluate=line_evaluation,
+                 radius=2, max_depth=None):
+        self.k = k
+        self.time_limit = time_limit
+        self.evaluate = evaluate
+        self.radius = radius
+        self.max_depth = max_depth
+
+        # Statistics for the last search
+        self.nodes = 0
+        self.depth = 0
+
+    def best_move(self, board):
+        """
+        Returns the best action found within the time limit for the
+        player to move, or None if the game is over.
+        """
+        if terminal(board, self.k):
+            return None
+
+        self.board = [row[:] for row in board]
+        self.m, self.n = len(board), len(board[0])
+        self.lines = windows(self.m, self.n, self.k)
+        self.empty = sum(row.count(EMPTY) for row in board)
+        self.deadline = time.perf_counter() + self.time_limit
+        self.killers = {}
+        self.history = {}
+        self.nodes = 0
+        self.depth = 0
+
+        mark = player(board)
+        moves = self.candidates()
+        best = moves[0]
+        if len(moves) == 1:
+            return best
+        max_depth = self.empty
+        if self.max_depth is not None:
+            max_depth = min(max_depth, self.max_depth)
+
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move = self.root(depth, mark, best)
+            except SearchTimeout:
+                break
+            best = move
+            self.depth = depth
+
+            # A forced result will not change with more depth
+            if abs(score) >= WIN - self.empty:
+                break
+
+        return best
+
+    def root(self, depth, mark, first):
+        """
+        Searches every candidate move to `depth`, trying the best move of
+        the previous iteration first. Returns (score, move).
+        """
+        moves = self.order(self.candidates(), 0, first)
+        alpha, beta = -math.inf, math.inf
+        best = moves[0]
+        for move in moves:
+            score = self.score_move(move, mark, depth, alpha, beta, 1)
+            if score > alpha:
+                alpha, best = score, move
+        return alpha, best
+
+    def score_move(self, move, mark, depth, alpha, beta, ply):
+        """
+        Plays `move` for `mark`, and returns its score for `mark`.
+        """
+        i, j = move
+        self.board[i][j] = mark
+        self.empty -= 1
+        try:
+            if wins(self.board, move, self.k):
+                return WIN - ply
+            if self.empty == 0:
+                return 0
+            other = O if mark == X else X
+            return -self.negamax(depth - 1, -beta, -alpha, other, ply + 1)
+        finally:
+            self.board[i][j] = EMPTY
+            self.empty += 1
+
+    def negamax(self, depth, alpha, beta, mark, ply):
+        """
+        Returns the score of the board for `mark`, the player to move.
+        """
+        self.nodes += 1
+        if self.nodes % 64 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if depth == 0:
+            return self.evaluate(self.board, mark, self.k, self.lines)
+
+        best = -math.inf
+        for move in self.order(self.candidates(), ply):
+            score = self.score_move(move, mark, depth, alpha, beta, ply)
+            if score > best:
+                best = score
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                self.remember(move, ply, depth)
+                break
+        return best
+
+    def remember(self, move, ply, depth):
+        """
+        Records a move that caused a cutoff as a killer move at its ply,
+        and raises its history score.
+        """
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    def order(self, moves, ply, first=None):
+        """
+        Returns moves in search order: `first`, then killer moves at this
+        ply, then the rest by history score.
+        """
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        def priority(move):
+            if move == first:
+                return (0, 0)
+            if move in killers:
+                return (1, killers.index(move))
+            return (2, -history.get(move, 0))
+
+        return sorted(moves, key=priority)
+
+    def candidates(self):
+        """
+        Returns the empty cells within `radius` of a mark, or the centre
+        of the board if it is empty.
+        """
+        board, m, n, radius = self.board, self.m, self.n, self.radius
+        moves = []
+        for i in range(m):
+            for j in range(n):
+                if board[i][j] != EMPTY:
+                    continue
+                if any(board[y][x] != EMPTY
+                       for y in range(max(0, i - radius), min(m, i + radius + 1))
+                       for x in range(max(0, j - radius), min(n, j + radius + 1))):
+                    moves.append((i, j))
+        if not moves:
+            moves.append((m // 2, n // 2))
+        return moves
+
+
+def minimax(board, k=3, time_limit=1.0, evaluate=line_evaluation):
+    """
+    Returns the best action found within `time_limit` seconds for the
+    current player on the board.
+    """
+    return Search(k, time_limit, evaluate).best_move(board)
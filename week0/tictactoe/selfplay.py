@@ -0,0 +1,173 @@
+"""
+Headless self-play benchmark for the Tic Tac Toe engine.
+
+Plays N games between two agents, split across worker processes, and
+prints a JSON report with games per second and, for each agent, the
+nodes searched per move and move latency percentiles, so that changes
+to tictactoe.py can be compared run against run.
+
+Agents:
+    minimax  tictactoe.minimax, which answers from the opening book
+    search   tictactoe.search, alpha-beta search without the book
+    book     the opening book alone
+    random   a uniformly random legal move
+
+Every game starts with an empty transposition table, so nodes per move
+measure the search itself rather than what earlier games left behind.
+
+Usage: python selfplay.py X_AGENT O_AGENT [--games N] [--workers N]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import book
+import tictactoe as ttt
+
+
+def book_move(board, rng):
+    state = ttt.board_key(board)
+    x = sum(1 << k for k in range(9) if state[k] == ttt.X)
+    o = sum(1 << k for k in range(9) if state[k] == ttt.O)
+    k = book.lookup(x, o)
+    return k // 3, k % 3
+
+
+def random_move(board, rng):
+    return rng.choice(sorted(ttt.actions(board)))
+
+
+AGENTS = {
+    "minimax": lambda board, rng: ttt.minimax(board),
+    "search": lambda board, rng: ttt.search(board),
+    "book": book_move,
+    "random": random_move
+}
+
+
+def play(agents, seed):
+    """
+    Plays one game between agents, a dictionary from each player to an
+    agent name. Returns the winner and a list of (player, latency, nodes)
+    for every move.
+    """
+    rng = random.Random(seed)
+    ttt.transpositions.clear()
+    board = ttt.initial_state()
+    moves = []
+    while not ttt.terminal(board):
+        mark = ttt.player(board)
+        choose = AGENTS[agents[mark]]
+        nodes = ttt.nodes
+        start = time.perf_counter()
+        action = choose(board, rng)
+        latency = time.perf_counter() - start
+        moves.append((mark, latency, ttt.nodes - nodes))
+        board = ttt.result(board, action)
+    return ttt.winner(board), moves
+
+
+def play_many(x_agent, o_agent, seeds):
+    """
+    Plays one game per seed and returns the list of results.
+    """
+    agents = {ttt.X: x_agent, ttt.O: o_agent}
+    return [play(agents, seed) for seed in seeds]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def summarize(moves):
+    """
+    Returns per-agent statistics for a list of (latency, nodes) moves.
+    """
+    latencies = [latency for latency, _ in moves]
+    nodes = [count for _, count in moves]
+    return {
+        "moves": len(moves),
+        "mean_nodes": sum(nodes) / len(nodes) if nodes else 0.0,
+        "max_nodes": max(nodes, default=0),
+        "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50_latency": percentile(latencies, 0.50),
+        "p95_latency": percentile(latencies, 0.95),
+        "p99_latency": percentile(latencies, 0.99),
+        "max_latency": max(latencies, default=0.0)
+    }
+
+
+def run(x_agent, o_agent, games, workers=None, seed=0):
+    """
+    Plays `games` games across `workers` processes (1 plays them
+    in-process) and returns the report as a dictionary.
+    """
+    workers = workers or os.cpu_count()
+    seeds = list(range(seed, seed + games))
+    chunks = [seeds[i::workers] for i in range(workers) if seeds[i::workers]]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = play_many(x_agent, o_agent, seeds)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(play_many, x_agent, o_agent, chunk)
+                       for chunk in chunks]
+            results = [game for future in futures for game in future.result()]
+    elapsed = time.perf_counter() - start
+
+    outcomes = {ttt.X: 0, ttt.O: 0, "tie": 0}
+    moves = {ttt.X: [], ttt.O: []}
+    for winner, game_moves in results:
+        outcomes[winner or "tie"] += 1
+        for mark, latency, nodes in game_moves:
+            moves[mark].append((latency, nodes))
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "workers": workers,
+        "games": games,
+        "elapsed": elapsed,
+        "games_per_second": games / elapsed if elapsed else 0.0,
+        "outcomes": outcomes,
+        "agents": {
+            ttt.X: dict(agent=x_agent, **summarize(moves[ttt.X])),
+            ttt.O: dict(agent=o_agent, **summarize(moves[ttt.O]))
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("x_agent", choices=AGENTS)
+    parser.add_argument("o_agent", choices=AGENTS)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (1 plays in-process)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here, not stdout")
+    args = parser.parse_args()
+
+    report = run(args.x_agent, args.o_agent, args.games,
+                 args.workers, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ Tic Tac Toe Player
 
 import math
 
+import book
+
 X = "X"
 O = "O"
 EMPTY = None
@@ -131,51 +133,140 @@ def minimax(board):
     if terminal(board):
         return None
 
-    if player(board) == X:
-        beta = float("-inf")
-        for action in actions(board):
-            value = min_value(result(board, action))
-            
-            # Condition to find the highest value possible from all possible actions
-            if value == 1:
-                return action
-            elif value > beta:
-                beta = value
-                move = action
-    else:
-        alpha = float("inf")
-        for action in actions(board):
-            value = max_value(result(board, action))
+    # Answer from the opening book when it has the position
+    state = board_key(board)
+    x = sum(1 << k for k in range(9) if state[k] == X)
+    o = sum(1 << k for k in range(9) if state[k] == O)
+    k = book.lookup(x, o)
+    if k is not None:
+        return k // 3, k % 3
+
+    return search(board)
+
+
+def search(board):
+    """
+    Returns the optimal action for the current player on the board,
+    found by alpha-beta search without consulting the opening book.
+    """
+
+    if terminal(board):
+        return None
+
+    state = board_key(board)
+    maximizing = player(board) == X
+    alpha, beta = -math.inf, math.inf
+    move = None
 
-            # Condition to find the lowest value possible from all possible actions
+    for k in empty_cells(state):
+        value = alphabeta(place(state, k), alpha, beta)
+
+        # Keep the best action so far; a win cannot be improved on
+        if maximizing and value > alpha:
+            alpha, move = value, (k // 3, k % 3)
+            if value == 1:
+                break
+        elif not maximizing and value < beta:
+            beta, move = value, (k // 3, k % 3)
             if value == -1:
-                return action
-            elif value < alpha:
-                alpha = value
-                move = action
-                
+                break
+
     return move
 
 
-def max_value(board):
+# Search engine: boards are flattened into 9-tuples, which are hashable,
+# cheap to copy and index, and key the transposition table
 
-    value = float("-inf")
-    
-    if terminal(board):
-        return utility(board)
+# Every line of three cells, as indices into a 9-tuple
+LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6)
+)
 
-    for action in actions(board):
-        value = max(value, min_value(result(board, action)))
-    return value
+# Kinds of values stored in the transposition table: an exact minimax
+# value, or a bound left by an alpha-beta cutoff
+EXACT = 0
+LOWER = 1
+UPPER = 2
 
+# Maps a board key to (value, kind), shared by every search so that
+# positions solved during one move or game are never searched again
+transpositions = {}
+
+# Number of positions alphabeta has been called on, for benchmarks
+nodes = 0
 
-def min_value(board):
-    
-    value = float("inf")
-    
-    if terminal(board):
-        return utility(board)
 
-    for action in actions(board):
-        value = min(value, max_value(result(board, action)))
-    return value
\ No newline at end of file
+def board_key(board):
+    """
+    Returns a board as a 9-tuple of cells, in row-major order.
+    """
+    return tuple(board[0] + board[1] + board[2])
+
+
+def empty_cells(state):
+    """
+    Returns the indices of the empty cells of a board key.
+    """
+    return [k for k in range(9) if state[k] is EMPTY]
+
+
+def place(state, k):
+    """
+    Returns the board key after the player to move takes cell k.
+    """
+    mark = O if state.count(X) > state.count(O) else X
+    return state[:k] + (mark,) + state[k + 1:]
+
+
+def alphabeta(state, alpha, beta):
+    """
+    Returns the minimax value of a board key, searched with alpha-beta
+    pruning within the window (alpha, beta). Values outside the window
+    are bounds on the true value, as usual for alpha-beta.
+    """
+    global nodes
+    nodes += 1
+
+    entry = transpositions.get(state)
+    if entry is not None:
+        value, kind = entry
+        if (kind == EXACT
+                or (kind == LOWER and value >= beta)
+                or (kind == UPPER and value <= alpha)):
+            return value
+
+    for a, b, c in LINES:
+        if state[a] is not EMPTY and state[a] == state[b] == state[c]:
+            value = 1 if state[a] == X else -1
+            transpositions[state] = (value, EXACT)
+            return value
+    cells = empty_cells(state)
+    if not cells:
+        transpositions[state] = (0, EXACT)
+        return 0
+
+    original_alpha, original_beta = alpha, beta
+    if state.count(X) <= state.count(O):
+        value = -math.inf
+        for k in cells:
+            value = max(value, alphabeta(place(state, k), alpha, beta))
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+    else:
+        value = math.inf
+        for k in cells:
+            value = min(value, alphabeta(place(state, k), alpha, beta))
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+    if value <= original_alpha:
+        transpositions[state] = (value, UPPER)
+    elif value >= original_beta:
+        transpositions[state] = (value, LOWER)
+    else:
+        transpositions[state] = (value, EXACT)
+    return value
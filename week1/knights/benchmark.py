@@ -0,0 +1,145 @@
+"""
+Benchmark the entailment backends on generated knights-and-knaves puzzles.
+
+For each number of characters N, random puzzles with N characters and
+at least round(N * ratio) statements are generated, and every backend is
+asked which knight and knave symbols each puzzle entails. Every puzzle
+has exactly one solution, so the answers must match it. Solve times are
+printed as JSON, along with any puzzle where the backends disagree or
+get the solution wrong.
+
+Backends:
+    enumerate  logic.enumerate_check, one query at a time
+    table      logic.table_check, one query at a time
+    sat        sat.entails, one query at a time
+    many       logic.model_check_many, every query in one pass
+
+Enumeration and truth tables take time exponential in the number of
+symbols, so they are skipped on puzzles with more symbols than
+--max-enumerate and --max-table respectively.
+
+Usage: python benchmark.py [--characters N ...] [--ratio R] [--puzzles N]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import logic
+import sat
+from generator import generate
+
+BACKENDS = {
+    "enumerate": lambda knowledge, queries: [
+        logic.enumerate_check(knowledge, query) for query in queries
+    ],
+    "table": lambda knowledge, queries: [
+        logic.table_check(knowledge, query) for query in queries
+    ],
+    "sat": lambda knowledge, queries: [
+        sat.entails(knowledge, query) for query in queries
+    ],
+    "many": logic.model_check_many
+}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def benchmark_size(n, m, puzzles, backends, max_enumerate, max_table,
+                   seed=0):
+    """
+    Solves `puzzles` generated puzzles of n characters and at least m
+    statements with every backend that can handle them. Returns the results as a
+    dictionary.
+    """
+    times = {backend: [] for backend in backends}
+    statements = 0
+    mismatches = 0
+    wrong = 0
+
+    for i in range(puzzles):
+        knowledge, symbols, solution = generate(n, m, seed=f"{seed}-{n}-{i}")
+        statements += (len(knowledge.conjuncts) - n) // 2
+        answers = {}
+        for backend in backends:
+            if backend == "enumerate" and len(symbols) > max_enumerate:
+                continue
+            if backend == "table" and len(symbols) > max_table:
+                continue
+            start = time.perf_counter()
+            answers[backend] = BACKENDS[backend](knowledge, symbols)
+            times[backend].append(time.perf_counter() - start)
+
+        results = list(answers.values())
+        if any(result != results[0] for result in results):
+            mismatches += 1
+        # Exactly the symbols true in the solution must be entailed
+        if results and results[0] != [solution[s.name] for s in symbols]:
+            wrong += 1
+
+    return {
+        "characters": n,
+        "statements": statements / puzzles if puzzles else 0.0,
+        "symbols": 2 * n,
+        "puzzles": puzzles,
+        "mismatches": mismatches,
+        "wrong": wrong,
+        "backends": {
+            backend: {
+                "solved": len(runs),
+                "mean_time": sum(runs) / len(runs),
+                "p50_time": percentile(runs, 0.50),
+                "max_time": max(runs)
+            }
+            for backend, runs in times.items() if runs
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--characters", type=int, nargs="+",
+                        default=[3, 6, 9, 12, 25, 50, 100])
+    parser.add_argument("--ratio", type=float, default=1.5,
+                        help="statements per character")
+    parser.add_argument("--puzzles", type=int, default=5,
+                        help="puzzles per number of characters")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS,
+                        default=list(BACKENDS))
+    parser.add_argument("--max-enumerate", type=int, default=16,
+                        help="most symbols to solve by enumeration")
+    parser.add_argument("--max-table", type=int, default=20,
+                        help="most symbols to solve with truth tables")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here, not stdout")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "sizes": [
+            benchmark_size(n, round(n * args.ratio), args.puzzles,
+                           args.backends, args.max_enumerate,
+                           args.max_table, args.seed)
+            for n in args.characters
+        ]
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
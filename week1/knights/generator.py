@@ -0,0 +1,118 @@
+"""
+Random knights-and-knaves puzzles.
+
+Every character is either a knight, who always tells the truth, or a
+knave, who always lies. A puzzle is made by first choosing who is which,
+then having random characters make random claims about the others; a
+claim that would not fit the speaker is negated, so the chosen roles are
+always a solution. Claims about characters whose role does not follow
+yet are added until every role does, so the solution is also the only
+one. Puzzles are encoded as in puzzle.py, with the logic classes from
+logic.py.
+"""
+
+import random
+
+from logic import (And, Or, Not, Implication, Biconditional, Symbol,
+                   CompiledKnowledgeBase)
+
+
+def character_names(n):
+    """
+    Returns n character names: A to Z, then P27, P28 and so on.
+    """
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [letters[i] if i < len(letters) else f"P{i + 1}" for i in range(n)]
+
+
+def knight(name):
+    return Symbol(f"{name} is a Knight")
+
+
+def knave(name):
+    return Symbol(f"{name} is a Knave")
+
+
+def claim(rng, names, solution, subject=None):
+    """
+    Returns a random claim about the characters, such as "B is a knave",
+    "A and C are knights" or "B and I are the same kind", and whether it
+    is true in the solution. If `subject` is given, the claim is about
+    that character and one other.
+    """
+    def atom(name):
+        if rng.random() < 0.5:
+            return knight(name), solution[name]
+        return knave(name), not solution[name]
+
+    # Claims are about two different characters, when there are two
+    first, second = rng.sample(names, 2) if len(names) > 1 else names * 2
+    if subject is not None:
+        others = [name for name in names if name != subject] or names
+        first, second = subject, rng.choice(others)
+        if rng.random() < 0.5:
+            first, second = second, first
+    (a, a_true), (b, b_true) = atom(first), atom(second)
+    form = rng.randrange(5)
+    if form == 0:
+        return a, a_true
+    if form == 1:
+        return And(a, b), a_true and b_true
+    if form == 2:
+        return Or(a, b), a_true or b_true
+    if form == 3:
+        return Implication(a, b), not a_true or b_true
+    return Biconditional(a, b), a_true == b_true
+
+
+def generate(n, m, seed=None):
+    """
+    Returns (knowledge, symbols, solution) for a random puzzle with n
+    characters and at least m statements, whose knowledge entails the
+    role of every character. `symbols` are the knight and knave symbols
+    of every character, and `solution` maps each symbol's name to its
+    truth value in the roles the puzzle was made from.
+    """
+    rng = random.Random(seed)
+    names = character_names(n)
+    solution = {name: rng.random() < 0.5 for name in names}
+
+    # Every character is exactly one of a knight and a knave
+    sentences = [Biconditional(knight(name), Not(knave(name)))
+                 for name in names]
+    compiled = CompiledKnowledgeBase(*sentences)
+
+    # A knight's claims are true and a knave's are false
+    def state(subject=None):
+        speaker = rng.choice(names)
+        statement, true = claim(rng, names, solution, subject)
+        if true != solution[speaker]:
+            statement = Not(statement)
+        for sentence in (Implication(knight(speaker), statement),
+                         Implication(knave(speaker), Not(statement))):
+            sentences.append(sentence)
+            compiled.add(sentence)
+
+    for _ in range(m):
+        state()
+
+    # Keep making claims about a character whose role does not follow
+    # yet; as the solution is a model, entailing the true one of their
+    # knight and knave symbols settles them
+    undetermined = list(names)
+    while undetermined:
+        undetermined = [
+            name for name in undetermined
+            if not compiled.entails(knight(name) if solution[name]
+                                    else knave(name))
+        ]
+        if undetermined:
+            state(rng.choice(undetermined))
+
+    symbols = []
+    truths = {}
+    for name in names:
+        symbols.extend([knight(name), knave(name)])
+        truths[knight(name).name] = solution[name]
+        truths[knave(name).name] = not solution[name]
+    return And.bulk(sentences), symbols, truths
@@ -1,19 +1,218 @@
-import itertools
+import time
+import weakref
 
 
 class Sentence():
+    """
+    Sentences are immutable and interned: constructing a sentence equal
+    to one that already exists returns the existing object, so equal
+    subtrees are shared and equality is identity. Each sentence computes
+    its hash and its set of symbols once, when it is created.
+    """
+
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    # Every live sentence, keyed by its class and operands
+    interned = weakref.WeakValueDictionary()
+
+    # Evaluation orders for Sentence.walk, kept while their sentence lives
+    schedules = weakref.WeakKeyDictionary()
+
+    # Whether combining operand values can be done pairwise, left to
+    # right, which lets Sentence.walk fold them in one at a time
+    associative = False
+
+    @staticmethod
+    def intern(cls, key, symbols, **fields):
+        """Returns the sentence of class cls for key, creating it if needed."""
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            for name, value in fields.items():
+                object.__setattr__(sentence, name, value)
+            object.__setattr__(sentence, "_hash", hash(key))
+            object.__setattr__(sentence, "_symbols", symbols)
+            Sentence.interned[key] = sentence
+        return sentence
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return self._hash
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    def operands(self):
+        """Returns the sentences this sentence is built from."""
+        return ()
+
+    def postorder(self):
+        """Returns each distinct subsentence once, after its operands."""
+        order = []
+        seen = set()
+        stack = [(self, False)]
+        while stack:
+            sentence, expanded = stack.pop()
+            if expanded:
+                order.append(sentence)
+            elif sentence not in seen:
+                seen.add(sentence)
+                stack.append((sentence, True))
+                stack.extend((operand, False)
+                             for operand in reversed(sentence.operands())
+                             if operand not in seen)
+        return order
+
+    def walk(self, leaf, combine, fold=False):
+        """
+        Computes a value bottom-up over the sentence without recursion, so
+        deeply nested sentences cannot exceed the recursion limit. Symbols
+        get leaf(symbol), other sentences get combine(sentence, values of
+        its operands), and shared subsentences are computed only once.
+
+        If `fold` is true, an operand of an And or Or that is used nowhere
+        else is combined into its parent's value as soon as it is ready,
+        and dropped, so a wide conjunction never holds all of its
+        operands' values at once. combine must then give the same value
+        for [a, b, c] as for [combine([a, b]), c].
+        """
+        schedule = Sentence.schedules.get(self)
+        if schedule is None:
+            schedule = Sentence.schedules[self] = self.plan()
+        order, operands, folds, releases = schedule
+        operands, releases = operands[fold], releases[fold]
+
+        def at(i):
+            return order[i] if i < len(order) else self
+
+        values = [None] * len(operands)
+        started = bytearray(len(operands))
+        for i, indices in enumerate(operands):
+            sentence = at(i)
+            if indices is None:
+                values[i] = leaf(sentence)
+            elif not started[i]:
+                values[i] = combine(sentence, [values[j] for j in indices])
+            elif indices:
+                values[i] = combine(
+                    sentence, [values[i]] + [values[j] for j in indices]
+                )
+            parent = folds[i]
+            if fold and parent is not None:
+                if started[parent]:
+                    values[parent] = combine(
+                        at(parent), [values[parent], values[i]]
+                    )
+                else:
+                    values[parent] = combine(at(parent), [values[i]])
+                    started[parent] = 1
+            for j in releases[i]:
+                values[j] = None
+        return values[-1]
+
+    def plan(self):
+        """
+        Returns the cached evaluation order for Sentence.walk: the
+        subsentences in postorder, without the sentence itself, which
+        would otherwise be kept alive; the positions of each one's
+        operands, or None for symbols, without and with folding; the
+        position of the And or Or each one is folded into, if any; and,
+        without and with folding, the positions whose values can be
+        dropped after each step.
+        """
+        order = self.postorder()
+        positions = {sentence: i for i, sentence in enumerate(order)}
+        operands = [
+            None if isinstance(sentence, Symbol)
+            else [positions[operand] for operand in sentence.operands()]
+            for sentence in order
+        ]
+
+        # Only operands with a single use are folded early; shared ones
+        # are kept for their other uses anyway, and folding them early
+        # would start their parents' values long before they are needed
+        uses = [[] for _ in order]
+        for i, indices in enumerate(operands):
+            for j in indices or ():
+                uses[j].append(i)
+        folds = [
+            parents[0] if len(parents) == 1 and order[parents[0]].associative
+            else None
+            for parents in uses
+        ]
+        folded = [
+            None if indices is None
+            else [j for j in indices if folds[j] != i]
+            for i, indices in enumerate(operands)
+        ]
+
+        # Drop each value after its last use; a folded value is used up
+        # as soon as it is computed
+        plain = [[] for _ in order]
+        early = [[] for _ in order]
+        for j, parents in enumerate(uses):
+            if parents:
+                plain[parents[-1]].append(j)
+                early[j if folds[j] is not None else parents[-1]].append(j)
+        return order[:-1], (operands, folded), folds, (plain, early)
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
+        return self.walk(lambda symbol: symbol.evaluate(model),
+                         lambda sentence, values: sentence.combine(values))
+
+    def combine(self, values):
+        """Returns the truth value given the values of the operands."""
+        raise Exception("nothing to evaluate")
+
+    def partial(self, model):
+        """
+        Evaluates the logical sentence in a partial model, which may leave
+        symbols unassigned. Returns True or False if that holds however
+        the unassigned symbols are set, or None if it depends on them.
+        """
+        return self.walk(
+            lambda symbol: symbol.partial(model),
+            lambda sentence, values: sentence.combine_partial(values)
+        )
+
+    def combine_partial(self, values):
+        """Returns the partial value given those of the operands."""
+        raise Exception("nothing to evaluate")
+
+    def table(self, columns, mask):
+        """
+        Evaluates the logical sentence in every model at once. `columns`
+        maps each symbol to a bitset of the models where it is true, and
+        `mask` has one bit set per model; returns the bitset of models
+        where the sentence is true.
+        """
+        return self.walk(
+            lambda symbol: symbol.table(columns, mask),
+            lambda sentence, values: sentence.combine_table(values, mask),
+            fold=True
+        )
+
+    def combine_table(self, values, mask):
+        """Returns the table given the tables of the operands."""
         raise Exception("nothing to evaluate")
 
     def formula(self):
         """Returns string formula representing logical sentence."""
+        return self.walk(
+            lambda symbol: symbol.formula(),
+            lambda sentence, formulas: sentence.combine_formula(formulas)
+        )
+
+    def combine_formula(self, formulas):
+        """Returns the formula given the formulas of the operands."""
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        return self._symbols
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +242,14 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
-        self.name = name
+    def __new__(cls, name):
+        return Sentence.intern(cls, ("symbol", name), frozenset((name,)),
+                               name=name)
 
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
-
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __repr__(self):
         return self.name
@@ -62,50 +260,74 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
+    def table(self, columns, mask):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
-
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        return Sentence.intern(cls, ("not", operand), operand.symbols(),
+                               operand=operand)
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
-
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def __reduce__(self):
+        return (Not, (self.operand,))
 
     def __repr__(self):
         return f"Not({self.operand})"
 
-    def evaluate(self, model):
-        return not self.operand.evaluate(model)
+    def operands(self):
+        return (self.operand,)
 
-    def formula(self):
-        return "¬" + Sentence.parenthesize(self.operand.formula())
+    def combine(self, values):
+        return not values[0]
 
-    def symbols(self):
-        return self.operand.symbols()
+    def combine_partial(self, values):
+        return None if values[0] is None else not values[0]
+
+    def combine_table(self, values, mask):
+        return mask & ~values[0]
+
+    def combine_formula(self, formulas):
+        return "¬" + Sentence.parenthesize(formulas[0])
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+    associative = True
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return cls.bulk(conjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+    @classmethod
+    def bulk(cls, conjuncts):
+        """
+        Returns the conjunction of an iterable of sentences, as And(*conjuncts)
+        does, without checking that each of them is a sentence.
+        """
+        conjuncts = tuple(conjuncts)
+        symbols = frozenset().union(
+            *[conjunct.symbols() for conjunct in conjuncts]
         )
+        return Sentence.intern(cls, ("and", conjuncts), symbols,
+                               conjuncts=conjuncts)
+
+    def __reduce__(self):
+        return (And, self.conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,150 +336,391 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        # Interned sentences may be shared, so they cannot grow in place
+        raise TypeError("sentences are immutable; "
+                        "use And(*knowledge.conjuncts, conjunct) or "
+                        "CompiledKnowledgeBase.add instead")
 
-    def evaluate(self, model):
-        return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
+    def operands(self):
+        return self.conjuncts
 
-    def formula(self):
-        if len(self.conjuncts) == 1:
-            return self.conjuncts[0].formula()
-        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
-                           for conjunct in self.conjuncts])
+    def combine(self, values):
+        return all(values)
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def combine_partial(self, values):
+        if False in values:
+            return False
+        return None if None in values else True
+
+    def combine_table(self, values, mask):
+        result = mask
+        for value in values:
+            result &= value
+        return result
+
+    def combine_formula(self, formulas):
+        if len(formulas) == 1:
+            return formulas[0]
+        return " ∧ ".join([Sentence.parenthesize(formula)
+                           for formula in formulas])
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+    associative = True
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return cls.bulk(disjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+    @classmethod
+    def bulk(cls, disjuncts):
+        """
+        Returns the disjunction of an iterable of sentences, as Or(*disjuncts)
+        does, without checking that each of them is a sentence.
+        """
+        disjuncts = tuple(disjuncts)
+        symbols = frozenset().union(
+            *[disjunct.symbols() for disjunct in disjuncts]
         )
+        return Sentence.intern(cls, ("or", disjuncts), symbols,
+                               disjuncts=disjuncts)
+
+    def __reduce__(self):
+        return (Or, self.disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
-    def evaluate(self, model):
-        return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
+    def operands(self):
+        return self.disjuncts
 
-    def formula(self):
-        if len(self.disjuncts) == 1:
-            return self.disjuncts[0].formula()
-        return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
-                            for disjunct in self.disjuncts])
+    def combine(self, values):
+        return any(values)
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def combine_partial(self, values):
+        if True in values:
+            return True
+        return None if None in values else False
+
+    def combine_table(self, values, mask):
+        result = 0
+        for value in values:
+            result |= value
+        return result
+
+    def combine_formula(self, formulas):
+        if len(formulas) == 1:
+            return formulas[0]
+        return " ∨  ".join([Sentence.parenthesize(formula)
+                            for formula in formulas])
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        return Sentence.intern(
+            cls, ("implies", antecedent, consequent),
+            antecedent.symbols() | consequent.symbols(),
+            antecedent=antecedent, consequent=consequent
+        )
 
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    def __reduce__(self):
+        return (Implication, (self.antecedent, self.consequent))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
-    def evaluate(self, model):
-        return ((not self.antecedent.evaluate(model))
-                or self.consequent.evaluate(model))
+    def operands(self):
+        return (self.antecedent, self.consequent)
 
-    def formula(self):
-        antecedent = Sentence.parenthesize(self.antecedent.formula())
-        consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} => {consequent}"
+    def combine(self, values):
+        return (not values[0]) or values[1]
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def combine_partial(self, values):
+        antecedent, consequent = values
+        if antecedent is False or consequent is True:
+            return True
+        return False if antecedent is True and consequent is False else None
+
+    def combine_table(self, values, mask):
+        return (mask & ~values[0]) | values[1]
+
+    def combine_formula(self, formulas):
+        antecedent = Sentence.parenthesize(formulas[0])
+        consequent = Sentence.parenthesize(formulas[1])
+        return f"{antecedent} => {consequent}"
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        return Sentence.intern(cls, ("biconditional", left, right),
+                               left.symbols() | right.symbols(),
+                               left=left, right=right)
 
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    def __reduce__(self):
+        return (Biconditional, (self.left, self.right))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
-    def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
-
-    def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
-        return f"{left} <=> {right}"
-
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
+    def operands(self):
+        return (self.left, self.right)
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def combine(self, values):
+        return values[0] == values[1]
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+    def combine_partial(self, values):
+        if None in values:
+            return None
+        return values[0] == values[1]
 
-        # If model has an assignment for each symbol
-        if not symbols:
+    def combine_table(self, values, mask):
+        return mask & ~(values[0] ^ values[1])
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+    def combine_formula(self, formulas):
+        left = Sentence.parenthesize(formulas[0])
+        right = Sentence.parenthesize(formulas[1])
+        return f"{left} <=> {right}"
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+# Largest number of symbols for which model_check uses truth tables,
+# which take 2^n bits per column; beyond it, the SAT solver is used
+TABLE_SYMBOLS = 24
+
+
+def truth_table(symbols):
+    """
+    Returns (columns, mask) for evaluating sentences over `symbols` with
+    Sentence.table. Bit m of the column of the i-th symbol is bit i of m,
+    so the 2^n bits of each column together cover every model.
+    """
+    size = 1 << len(symbols)
+    mask = (1 << size) - 1
+    columns = {}
+    for i, symbol in enumerate(sorted(symbols)):
+        half = 1 << i
+        column = ((1 << half) - 1) << half
+        width = 2 * half
+        while width < size:
+            column |= column << width
+            width *= 2
+        columns[symbol] = column
+    return columns, mask
+
+
+def table_check(knowledge, query):
+    """Checks if knowledge base entails query, using truth tables."""
+    symbols = knowledge.symbols() | query.symbols()
+    columns, mask = truth_table(symbols)
+
+    # Entailed if no model makes knowledge true and query false
+    return knowledge.table(columns, mask) & ~query.table(columns, mask) == 0
+
+
+class CheckStats():
+    """
+    Counters for model_check: models examined (including partial models
+    that were pruned), sentence evaluations, and seconds spent. When the
+    SAT solver answers, every decision it made counts as a partial model
+    and every literal it propagated as an evaluation.
+    """
+
+    def __init__(self):
+        self.models = 0
+        self.evaluations = 0
+        self.time = 0.0
+
+    def as_dict(self):
+        return {
+            "models": self.models,
+            "evaluations": self.evaluations,
+            "time": self.time
+        }
+
+
+def model_check(knowledge, query, stats=None):
+    """Checks if knowledge base entails query, counting the work in stats."""
+    if stats is None:
+        stats = CheckStats()
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
-
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    symbols = knowledge.symbols() | query.symbols()
+    if len(symbols) > TABLE_SYMBOLS:
+        return sat_check(knowledge, query, stats)
+
+    start = time.perf_counter()
+    stats.models += 1 << len(symbols)
+    stats.evaluations += 2
+    entailed = table_check(knowledge, query)
+    stats.time += time.perf_counter() - start
+    return entailed
+
+
+def sat_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query with the SAT solver, by
+    checking that knowledge ∧ ¬query has no model.
+    """
+    if stats is None:
+        stats = CheckStats()
+    start = time.perf_counter()
+
+    # Imported here, since sat imports this module
+    import sat
+    encoder = sat.Encoder()
+    encoder.add(knowledge)
+    solver = encoder.solver
+    entailed = not solver.solve([-encoder.literal(query)])
+
+    stats.models += solver.decisions + 1
+    stats.evaluations += solver.propagations
+    stats.time += time.perf_counter() - start
+    return entailed
+
+
+def enumerate_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query by enumerating models, pruning
+    every branch whose answer no longer depends on the remaining symbols.
+    """
+    if stats is None:
+        stats = CheckStats()
+    start = time.perf_counter()
+
+    # Assign symbols in a fixed order, depth first, in one model that is
+    # undone on the way back up instead of copied for every branch;
+    # untried[i] holds the values still to try for the i-th symbol
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    model = dict()
+    untried = []
+    while True:
+        stats.models += 1
+
+        # Stop as soon as the answer no longer depends on the rest
+        stats.evaluations += 1
+        knowledge_value = knowledge.partial(model)
+        if knowledge_value is not False:
+            stats.evaluations += 1
+            query_value = query.partial(model)
+            if knowledge_value is True and query_value is False:
+                entailed = False
+                break
+            if query_value is not True:
+
+                # Choose the next unused symbol, and try it both ways
+                model[symbols[len(untried)]] = True
+                untried.append([False])
+                continue
+
+        # Entailment holds in every model from here, so go back up to
+        # the next value left to try
+        while untried and not untried[-1]:
+            untried.pop()
+            del model[symbols[len(untried)]]
+        if not untried:
+            entailed = True
+            break
+        model[symbols[len(untried) - 1]] = untried[-1].pop()
+
+    stats.time += time.perf_counter() - start
+    return entailed
+
+
+def model_check_many(knowledge, queries):
+    """
+    Checks which of several queries the knowledge base entails, returning
+    a list of booleans in the order of queries. The knowledge base is
+    compiled once for all the queries.
+    """
+    compiled = CompiledKnowledgeBase(knowledge)
+    return [compiled.entails(query) for query in queries]
+
+
+class CompiledKnowledgeBase():
+    """
+    A knowledge base compiled once, to answer many entailment queries and
+    to grow one sentence at a time without starting over.
+
+    While it has at most TABLE_SYMBOLS symbols, it is kept as the bitset
+    of its models in a truth table, so a query costs one evaluation of
+    the query's table. Beyond that it is compiled to clauses for the SAT
+    solver, which keeps its clauses and learnt clauses between queries
+    and checks each query as an assumption.
+    """
+
+    def __init__(self, *sentences):
+        self.sentences = []
+
+        # Truth table over the symbols so far, and the models among it
+        # that satisfy every sentence
+        self.columns = {}
+        self.mask = 1
+        self.models = 1
+
+        # SAT encoder, once the knowledge base is too large for tables
+        self.encoder = None
+
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        if self.encoder is None and self.fits(sentence):
+            self.extend(sentence.symbols())
+            self.models &= sentence.table(self.columns, self.mask)
+        elif self.encoder is None:
+            self.compile()
+        else:
+            self.encoder.add(sentence)
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        Sentence.validate(query)
+        if self.encoder is None and self.fits(query):
+            self.extend(query.symbols())
+            return self.models & ~query.table(self.columns, self.mask) == 0
+        if self.encoder is None:
+            self.compile()
+        solver = self.encoder.solver
+        return not solver.solve([-self.encoder.literal(query)])
+
+    def fits(self, sentence):
+        """Checks if the truth table would still be small enough."""
+        new = sentence.symbols() - self.columns.keys()
+        return len(self.columns) + len(new) <= TABLE_SYMBOLS
+
+    def extend(self, symbols):
+        """Adds truth table columns for symbols not seen before."""
+        for symbol in sorted(symbols - self.columns.keys()):
+
+            # Copy every model, with the new symbol false in the originals
+            # and true in the copies
+            size = self.mask.bit_length()
+            for name in self.columns:
+                self.columns[name] |= self.columns[name] << size
+            self.columns[symbol] = self.mask << size
+            self.models |= self.models << size
+            self.mask |= self.mask << size
+
+    def compile(self):
+        """Switches from the truth table to clauses for the SAT solver."""
+
+        # Imported here, since sat imports this module
+        import sat
+        self.encoder = sat.Encoder()
+        for sentence in self.sentences:
+            self.encoder.add(sentence)
+        self.columns = {}
+        self.mask = self.models = 1
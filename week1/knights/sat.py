@@ -0,0 +1,500 @@
+"""
+SAT-based entailment for logic.py.
+
+A knowledge base entails a query exactly when KB ∧ ¬query has no model,
+so instead of enumerating all 2^n models, sentences are compiled to
+clauses in conjunctive normal form and handed to a SAT solver.
+
+Compilation uses the Tseitin encoding: every compound subsentence gets
+a fresh variable defined to be equivalent to it, which keeps the clause
+count linear in the size of the sentence. Variables are positive ints
+and literals are signed ints, as in the DIMACS format.
+
+The solver is conflict-driven clause learning (CDCL): unit propagation
+over two watched literals per clause, first-UIP conflict analysis with
+non-chronological backjumping, activity-based branching with phase
+saving, and restarts. Solving under assumptions lets one solver answer
+many queries against the same clauses.
+"""
+
+import heapq
+
+from logic import Symbol, Not, And, Or, Implication, Biconditional
+
+
+class Solver():
+    """
+    CDCL SAT solver over integer literals.
+
+    Clauses can be added at any time between calls to solve, so a solver
+    can be grown and queried incrementally.
+    """
+
+    # Multiplier for the activity increment after every conflict
+    DECAY = 1 / 0.95
+
+    # Conflicts before the first restart, and growth factor after each
+    RESTART_FIRST = 100
+    RESTART_GROWTH = 1.5
+
+    def __init__(self):
+        self.variables = 0
+
+        # assigns[v] is 1 if variable v is true, -1 if false, 0 if unset
+        self.assigns = [0]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.polarity = [False]
+
+        self.clauses = []
+        self.watches = {}
+        self.trail = []
+        self.trail_lim = []
+        self.queue_head = 0
+        self.order = []
+        self.increment = 1.0
+
+        # False once the clauses are unsatisfiable with no assumptions
+        self.ok = True
+
+        # Variable assignment of the last satisfiable solve, indexed by
+        # variable
+        self.model = None
+
+        # Statistics
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def new_variable(self):
+        """
+        Returns a fresh variable.
+        """
+        self.variables += 1
+        variable = self.variables
+        self.assigns.append(0)
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.polarity.append(False)
+        self.watches[variable] = []
+        self.watches[-variable] = []
+        heapq.heappush(self.order, (0.0, variable))
+        return variable
+
+    def value(self, literal):
+        """
+        Returns 1 if literal is true, -1 if it is false, 0 if unassigned.
+        """
+        value = self.assigns[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        """
+        Adds the disjunction of literals as a clause. Returns False if the
+        clauses have become unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+
+        clause = []
+        for literal in literals:
+            value = self.value(literal)
+            if value == 1 or -literal in clause:
+                return True
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+        return self.ok
+
+    def attach(self, clause):
+        """
+        Stores a clause of two or more literals, watching the first two,
+        and returns its index.
+        """
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def enqueue(self, literal, reason):
+        """
+        Makes literal true at the current decision level.
+        """
+        variable = abs(literal)
+        self.assigns[variable] = 1 if literal > 0 else -1
+        self.level[variable] = len(self.trail_lim)
+        self.reason[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Propagates unit clauses until none are left. Returns the index of
+        a conflicting clause, or None if there is no conflict.
+        """
+        assigns = self.assigns
+        clauses = self.clauses
+        watches = self.watches
+
+        while self.queue_head < len(self.trail):
+            false_literal = -self.trail[self.queue_head]
+            self.queue_head += 1
+            self.propagations += 1
+
+            watching = watches[false_literal]
+            kept = []
+            conflict = None
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+
+                # Keep the literal that just became false in slot 1
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                first_value = assigns[abs(first)]
+                if first < 0:
+                    first_value = -first_value
+                if first_value == 1:
+                    kept.append(index)
+                    continue
+
+                # Look for another literal that is not false to watch
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = assigns[abs(literal)]
+                    if literal < 0:
+                        value = -value
+                    if value != -1:
+                        clause[1], clause[k] = literal, false_literal
+                        watches[literal].append(index)
+                        break
+                else:
+                    # The clause is unit or conflicting
+                    kept.append(index)
+                    if first_value == -1:
+                        kept.extend(watching[position + 1:])
+                        conflict = index
+                        break
+                    self.enqueue(first, index)
+
+            watches[false_literal] = kept
+            if conflict is not None:
+                self.queue_head = len(self.trail)
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learnt clause, backjump level) for a conflicting clause,
+        learning the first unique implication point clause.
+        """
+        seen = set()
+        learnt = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        current = len(self.trail_lim)
+        clause = self.clauses[conflict]
+
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen:
+                    continue
+                if self.level[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.level[variable] == current:
+                    pending += 1
+                else:
+                    learnt.append(other)
+
+            # Walk back along the trail to the next literal in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reason[abs(literal)]]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal from the highest remaining level second
+        deepest = max(range(1, len(learnt)),
+                      key=lambda i: self.level[abs(learnt[i])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def bump(self, variable):
+        """
+        Raises the branching activity of a variable involved in a conflict.
+        """
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-self.activity[v], v)
+                          for v in range(1, self.variables + 1)
+                          if self.assigns[v] == 0]
+            heapq.heapify(self.order)
+        else:
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def cancel_until(self, level):
+        """
+        Undoes every assignment made above decision level `level`.
+        """
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.assigns[variable] = 0
+            self.reason[variable] = None
+            self.polarity[variable] = literal > 0
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.queue_head = len(self.trail)
+
+    def pick_branch(self):
+        """
+        Returns the unassigned variable with the highest activity,
+        or None if every variable is assigned.
+        """
+        while self.order:
+            activity, variable = heapq.heappop(self.order)
+            if (self.assigns[variable] == 0
+                    and -activity == self.activity[variable]):
+                return variable
+        for variable in range(1, self.variables + 1):
+            if self.assigns[variable] == 0:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable with every literal in
+        `assumptions` true, storing a model in self.model, or False.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        restart = self.RESTART_FIRST
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+
+                learnt, level = self.analyze(conflict)
+                self.cancel_until(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.attach(learnt))
+                self.increment *= self.DECAY
+
+                if conflicts >= restart:
+                    conflicts = 0
+                    restart *= self.RESTART_GROWTH
+                    self.cancel_until(0)
+                continue
+
+            # Decide the assumptions first, one decision level each
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value == -1:
+                    self.cancel_until(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if value == 0:
+                    self.enqueue(literal, None)
+                continue
+
+            variable = self.pick_branch()
+            if variable is None:
+                self.model = [value == 1 for value in self.assigns]
+                self.cancel_until(0)
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(variable if self.polarity[variable] else -variable,
+                         None)
+
+
+class Encoder():
+    """
+    Compiles sentences to clauses in a Solver, using one variable per
+    symbol name and the Tseitin encoding for compound sentences.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = solver or Solver()
+        self.variables = {}
+
+        # Maps id(sentence) to (sentence, literal) for encoded sentences;
+        # the sentence is kept so that its id is not reused
+        self.literals = {}
+        self.true = None
+
+    def variable(self, name):
+        """
+        Returns the variable for a symbol name, creating it if needed.
+        """
+        variable = self.variables.get(name)
+        if variable is None:
+            variable = self.variables[name] = self.solver.new_variable()
+        return variable
+
+    def constant(self, value):
+        """
+        Returns a literal that is always `value`.
+        """
+        if self.true is None:
+            self.true = self.solver.new_variable()
+            self.solver.add_clause([self.true])
+        return self.true if value else -self.true
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, adding the Tseitin
+        clauses that define it.
+        """
+        literals = self.literals
+        stack = [(sentence, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in literals:
+                continue
+            if isinstance(node, Symbol):
+                literals[id(node)] = (node, self.variable(node.name))
+            elif not expanded:
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in node.operands())
+            else:
+                operands = [literals[id(operand)][1]
+                            for operand in node.operands()]
+                literals[id(node)] = (node, self.define(node, operands))
+        return literals[id(sentence)][1]
+
+    def define(self, sentence, operands):
+        """
+        Returns a literal equivalent to `sentence`, given literals for its
+        operands.
+        """
+        if isinstance(sentence, Not):
+            return -operands[0]
+        if isinstance(sentence, And):
+            return self.conjunction(operands)
+        if isinstance(sentence, Or):
+            return -self.conjunction([-operand for operand in operands])
+        if isinstance(sentence, Implication):
+            return -self.conjunction([operands[0], -operands[1]])
+        if isinstance(sentence, Biconditional):
+            a, b = operands
+            v = self.solver.new_variable()
+            self.solver.add_clause([-v, -a, b])
+            self.solver.add_clause([-v, a, -b])
+            self.solver.add_clause([v, a, b])
+            self.solver.add_clause([v, -a, -b])
+            return v
+        raise TypeError("must be a logical sentence")
+
+    def conjunction(self, operands):
+        """
+        Returns a literal equivalent to the conjunction of literals,
+        defining a fresh variable v with v <=> (a ∧ b ∧ ...) if needed.
+        """
+        if not operands:
+            return self.constant(True)
+        if len(operands) == 1:
+            return operands[0]
+        v = self.solver.new_variable()
+        for operand in operands:
+            self.solver.add_clause([-v, operand])
+        self.solver.add_clause([v] + [-operand for operand in operands])
+        return v
+
+    def add(self, sentence):
+        """
+        Adds clauses asserting that `sentence` is true. Returns False if
+        the clauses have become unsatisfiable.
+        """
+        stack = [sentence]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, And):
+                stack.extend(reversed(node.conjuncts))
+                continue
+
+            # Clauses of plain literals need no Tseitin variables
+            if isinstance(node, Or):
+                disjuncts = [self.plain(d) for d in node.disjuncts]
+            elif isinstance(node, Implication):
+                disjuncts = [self.plain(Not(node.antecedent)),
+                             self.plain(node.consequent)]
+            else:
+                disjuncts = [self.plain(node)]
+            if None in disjuncts:
+                self.solver.add_clause([self.literal(node)])
+            else:
+                self.solver.add_clause(disjuncts)
+        return self.solver.ok
+
+    def plain(self, sentence):
+        """
+        Returns the literal for a symbol or a negated symbol, or None for
+        any other sentence.
+        """
+        sign = 1
+        while isinstance(sentence, Not):
+            sentence = sentence.operand
+            sign = -sign
+        if isinstance(sentence, Symbol):
+            return sign * self.variable(sentence.name)
+        return None
+
+    def model(self):
+        """
+        Returns the solver's last model as a dictionary from symbol names
+        to truth values.
+        """
+        return {name: self.solver.model[variable]
+                for name, variable in self.variables.items()}
+
+
+def entails(knowledge, query):
+    """
+    Returns True if knowledge entails query, by checking that
+    knowledge ∧ ¬query is unsatisfiable.
+    """
+    encoder = Encoder()
+    encoder.add(knowledge)
+    return not encoder.solver.solve([-encoder.literal(query)])
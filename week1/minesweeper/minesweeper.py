@@ -140,6 +140,99 @@ class Sentence():
             self.cells.remove(cell)
 
 
+class KnowledgeBase():
+    """
+    Set of sentences about a Minesweeper game, indexed by cell.
+
+    Each distinct sentence is stored once, as its count keyed by the
+    frozenset of its cells, and each cell maps to the cell sets of the
+    sentences that mention it. Marking a cell, or looking for sentences
+    to combine with one, therefore only touches the sentences sharing
+    cells with it. Sentences left with no cells are dropped.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.index = {}
+
+        # Sentences added or changed since the last inference, in order
+        self.changed = {}
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __iter__(self):
+        for cells, count in self.counts.items():
+            yield Sentence(cells, count)
+
+    def add(self, cells, count):
+        """
+        Adds a sentence, unless it has no cells or is already known.
+        Returns True if it was added.
+        """
+        cells = frozenset(cells)
+        if not cells or cells in self.counts:
+            return False
+        self.counts[cells] = count
+        for cell in cells:
+            self.index.setdefault(cell, set()).add(cells)
+        self.changed[cells] = None
+        return True
+
+    def remove(self, cells):
+        """
+        Removes the sentence about `cells` and returns its count.
+        """
+        count = self.counts.pop(cells)
+        for cell in cells:
+            sentences = self.index[cell]
+            sentences.discard(cells)
+            if not sentences:
+                del self.index[cell]
+        self.changed.pop(cells, None)
+        return count
+
+    def mark(self, cell, mine):
+        """
+        Removes a cell known to be a mine or safe from every sentence.
+        """
+        for cells in list(self.index.get(cell, ())):
+            count = self.remove(cells)
+            self.add(cells - {cell}, count - 1 if mine else count)
+
+    def infer(self):
+        """
+        Compares each sentence changed since the last call with the
+        sentences it shares cells with. Whenever one sentence's cells are
+        a subset of another's, the difference is added as a new sentence.
+        Returns (mines, safes), the cells the changed sentences show to be
+        mines or safe.
+        """
+        mines = set()
+        safes = set()
+        while self.changed:
+            cells = next(iter(self.changed))
+            del self.changed[cells]
+            count = self.counts[cells]
+
+            if count == 0:
+                safes.update(cells)
+            elif count == len(cells):
+                mines.update(cells)
+
+            neighbors = set()
+            for cell in cells:
+                neighbors.update(self.index[cell])
+            neighbors.discard(cells)
+            for other in neighbors:
+                if cells < other:
+                    self.add(other - cells, self.counts[other] - count)
+                elif other < cells:
+                    self.add(cells - other, count - self.counts[other])
+
+        return mines, safes
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
@@ -158,8 +251,8 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true
+        self.knowledge = KnowledgeBase()
 
     def mark_mine(self, cell):
         """
@@ -167,8 +260,7 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.knowledge.mark(cell, mine=True)
 
     def mark_safe(self, cell):
         """
@@ -176,8 +268,7 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.knowledge.mark(cell, mine=False)
 
     def add_knowledge(self, cell, count):
         """
@@ -223,100 +314,21 @@ class MinesweeperAI():
                         nearby.add((i, j))
                     
         # Add a new sentence to the knowledge base
-        new_sentence = Sentence(nearby, count)
-        self.knowledge.append(new_sentence)
-        
-        new_knowledge = [new_sentence]
-        
-        # Loop to compare existing sentences in the knowledge base
-        print()
-        print()
-        print()
-        print("Inferring AI")
-        
-        # Loop until there's no more new_knowledge to add
-        while new_knowledge:
-            
-            # Loop over and skip empty sentences
-            for sentence1 in self.knowledge:
-                if not sentence1.cells:
-                    continue
-                
-                print("1: ", sentence1)
-                
-                # Loop over and skip empty sentence
-                for sentence2 in self.knowledge:
-                    if not sentence2.cells:
-                        continue
-                    
-                    # Skip itself
-                    if sentence1 == sentence2:
-                        continue
-                    
-                    print("2: ", sentence2)
-                    # If there're sentences that some elements are subset of other sentences, find the differences
-                    if sentence1.cells <= sentence2.cells:
-                        print("infer triggered")
-                    
-                        new_cells = sentence2.cells - sentence1.cells
-                        new_count = sentence2.count - sentence1.count
-                        
-                        # If there's new inference and is not already in the the new inference, into the new inference list
-                        if new_cells:
-                            new_infer_sentence = Sentence(new_cells, new_count)
-                            if new_infer_sentence not in new_knowledge:
-                                new_knowledge.append(new_infer_sentence)
-                                print("new infer sentence:", new_infer_sentence)
-            
-            # Adding new sentences from iteration into KB
-            for sentence in new_knowledge:
-                if sentence not in self.knowledge:
-                    self.knowledge.append(sentence)
-                    new_knowledge.pop(0)
-                elif sentence:
-                    new_knowledge.pop(0)
-                print("[New list]:", new_knowledge)
-        
-        # Loop through all sentences to mark any additional cells as safe or as mines        
-        for i in range(len(self.knowledge)):
-            for sentence in self.knowledge:
-                
-                # If a sentence count is 0, then all cells are safe
-                safe_cells = set()
-                if sentence.known_safes:
-                    for safe_cell in sentence.known_safes():
-                        safe_cells.add(safe_cell)
-                
-                # Mark cells as safe
-                while safe_cells:
-                    safe = safe_cells.pop()
-                    self.mark_safe(safe)
-                
-                # If the number of cells is equal to the count, then all cells are mines
-                mine_cells = set()
-                if sentence.known_mines:
-                    for mine_cell in sentence.known_mines():
-                        mine_cells.add(mine_cell)
-
-                # Mark cells as mine
-                while mine_cells:
-                    mine = mine_cells.pop()
-                    self.mark_mine(mine)
-        
-        # Print for debug
-        print()
-        print("[Knowlege Base]")
-        for sentence in self.knowledge:
-            print(sentence)
-            
-        print()
-        print("[Known mines]")
-        print(self.mines)
+        self.knowledge.add(nearby, count)
+
+        # Infer from the sentences that changed, and mark what they show,
+        # until nothing more can be concluded
+        while True:
+            mines, safes = self.knowledge.infer()
+            mines -= self.mines
+            safes -= self.safes
+            if not mines and not safes:
+                break
+            for mine in mines:
+                self.mark_mine(mine)
+            for safe in safes:
+                self.mark_safe(safe)
 
-        print()
-        print("[Known safes]")
-        print(self.safes)
-        
     def make_safe_move(self):
         """
         Returns a safe cell to choose on the Minesweeper board.